@@ -0,0 +1,99 @@
+"""
+Compare the jacklib and jack_lsp connection backends of JackHandler on a synthetic graph.
+
+No JACK server is needed: the jacklib connection query is answered from an in-memory edge
+table, and ``jack_lsp -c`` is emulated by a real ``cat`` subprocess over equivalent output,
+so the fork/exec and text parsing costs of the fallback backend are still measured.
+
+    python benchmarks/bench_connections.py --clients 50 --ports 64 --fanout 2
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+from jackmesh.fakejack import offline_handler
+from jackmesh.jackmesh import Port
+
+
+def build_graph(clients, ports_per_client, fanout):
+    """Return (ports, edges) where edges maps an output port name to its input port names."""
+    ports = []
+    for c in range(clients):
+        client = f"client{c}"
+        for p in range(ports_per_client):
+            for direction in ("output", "input"):
+                port_name = f"{direction}_{p}"
+                name = f"{client}:{port_name}"
+                ports.append(Port(MagicMock(), name, client, MagicMock(), port_name, "32 bit float mono audio",
+                                  name, direction, [], 0, 0, 0))
+
+    edges = {}
+    for c in range(clients):
+        for p in range(ports_per_client):
+            edges[f"client{c}:output_{p}"] = [f"client{(c + k + 1) % clients}:input_{p}" for k in range(fanout)]
+    return ports, edges
+
+
+def jack_lsp_text(ports, edges):
+    """Render the graph the way ``jack_lsp -c`` prints it."""
+    incoming = {}
+    for source, dests in edges.items():
+        for dest in dests:
+            incoming.setdefault(dest, []).append(source)
+
+    lines = []
+    for port in ports:
+        lines.append(port.name)
+        peers = edges.get(port.name) if port.direction == "output" else incoming.get(port.name)
+        lines.extend(f"   {peer}" for peer in peers or [])
+    return "\n".join(lines) + "\n"
+
+
+def run(backend, ports, edges, lsp_path, repeat):
+    ptr_to_name = {id(port.port_ptr): port.name for port in ports}
+
+    def port_get_all_connections(client, port_ptr):
+        return iter(edges.get(ptr_to_name[id(port_ptr)], ()))
+
+    def check_output(cmd, text=False):
+        return subprocess.run(["cat", lsp_path], capture_output=True, text=text, check=True).stdout
+
+    with patch("jackmesh.jackmesh.jacklib.port_get_all_connections", port_get_all_connections), \
+         patch("jackmesh.jackmesh.subprocess.check_output", check_output):
+        best = None
+        for _ in range(repeat):
+            jh = offline_handler(ports)
+            start = time.perf_counter()
+            connections = jh.get_jack_connections(backend=backend)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best, len(connections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JackHandler connection backends on a synthetic graph.")
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--ports', type=int, default=32, help='Output (and input) ports per client')
+    parser.add_argument('--fanout', type=int, default=2, help='Connections per output port')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    ports, edges = build_graph(args.clients, args.ports, args.fanout)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write(jack_lsp_text(ports, edges))
+        lsp_path = f.name
+
+    try:
+        print(f"{len(ports)} ports, {sum(len(d) for d in edges.values())} edges (best of {args.repeat})")
+        for backend in ("jacklib", "jack_lsp"):
+            elapsed, count = run(backend, ports, edges, lsp_path, args.repeat)
+            print(f"{backend:>8}: {elapsed * 1000:9.2f} ms  ({count} connections)")
+    finally:
+        os.unlink(lsp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Scaling benchmarks for jackmesh against the in-process fake JACK server.
+
+Each entry point runs on a small and a large synthetic graph (by default 1250 ports / 5k edges
+and 5000 ports / 20k edges). For both sizes the suite reports the best wall time, jacklib calls
+per function and peak traced memory. It then derives scaling exponents from the two sizes:
+1.0 means linear. The run fails (exit status 1) if the exponent of the jacklib call counts
+exceeds its threshold, so a change that turns a linear path quadratic is caught without audio
+hardware. Call counts are deterministic; wall times vary from run to run by more than the
+margin a time threshold could allow, so time exponents only fail the run if
+``--max-time-exponent`` is given.
+
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --call-latency 0.00001 --json results.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import toml
+
+from jackmesh import latency
+from jackmesh.fakejack import FakeJackServer
+from jackmesh.jackmesh import JackHandler, dumps, load
+
+
+def write_config(server, path, drop_every=10):
+    """Write a config describing the server's graph, minus every ``drop_every``-th edge, so load has work to do."""
+    config = {}
+    for i, (output_name, input_name) in enumerate(sorted(server.edges())):
+        if i % drop_every == 0:
+            continue
+        client, port_name = output_name.split(":", 1)
+        config.setdefault(client, {}).setdefault(port_name, []).append(input_name)
+    with open(path, "w") as f:
+        toml.dump(config, f)
+
+
+def entry_points(config_path):
+    return {
+        "enumerate": lambda: JackHandler().get_jack_ports(),
+        "connections": lambda: JackHandler().get_jack_connections(),
+        "connections_lsp": lambda: JackHandler().get_jack_connections(backend="jack_lsp"),
+        "load": lambda: load(config_path, disconnect=True),
+        "dump": lambda: dumps(JackHandler()),
+        "latency": lambda: latency.analyze(JackHandler()),
+    }
+
+
+def measure(make_server, func, repeat):
+    """Return (best wall time, call counts of one run, peak traced memory in bytes)."""
+    best = math.inf
+    calls = None
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            server = make_server()
+            with server.installed():
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+            calls = dict(server.calls)
+
+        server = make_server()
+        with server.installed():
+            tracemalloc.start()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return best, calls, peak
+
+
+def exponent(small, large, ratio):
+    if small <= 0 or large <= 0:
+        return 0.0
+    return math.log(large / small) / math.log(ratio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for jackmesh on a simulated JACK server.")
+    parser.add_argument('--clients', type=int, default=50, help='Clients in the large graph')
+    parser.add_argument('--ports', type=int, default=50, help='Output (and input) ports per client in the large graph')
+    parser.add_argument('--fanout', type=int, default=8, help='Connections per output port')
+    parser.add_argument('--scale', type=int, default=2,
+                        help='The small graph has clients/scale clients with ports/scale ports each')
+    parser.add_argument('--call-latency', type=float, default=0.0, help='Simulated seconds per jacklib call')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-time-exponent', type=float, default=None,
+                        help='Also fail if wall time grows faster than size**exponent. Wall times are noisy, '
+                             'so this is off by default')
+    parser.add_argument('--max-calls-exponent', type=float, default=1.05,
+                        help='Fail if jacklib call counts grow faster than size**exponent (default: 1.05)')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    sizes = {
+        "small": (args.clients // args.scale, args.ports // args.scale),
+        "large": (args.clients, args.ports),
+    }
+    results = {}
+    tmpdir = tempfile.mkdtemp()
+    for size, (clients, ports) in sizes.items():
+        def make_server(clients=clients, ports=ports):
+            return FakeJackServer.synthetic(clients, ports, fanout=args.fanout, call_latency=args.call_latency)
+
+        server = make_server()
+        config_path = os.path.join(tmpdir, f"{size}.toml")
+        write_config(server, config_path)
+        results[size] = {"ports": len(server.ports), "edges": len(server.edges()), "entry_points": {}}
+
+        for name, func in entry_points(config_path).items():
+            wall, calls, peak = measure(make_server, func, args.repeat)
+            results[size]["entry_points"][name] = {"wall_s": wall, "calls": calls, "peak_bytes": peak}
+
+    ratio = results["large"]["ports"] / results["small"]["ports"]
+    failed = False
+    print(f"small: {results['small']['ports']} ports, {results['small']['edges']} edges; "
+          f"large: {results['large']['ports']} ports, {results['large']['edges']} edges")
+    print(f"{'entry point':<16}{'small ms':>10}{'large ms':>10}{'peak MiB':>10}{'calls':>9}{'t exp':>7}{'c exp':>7}")
+    for name, large in results["large"]["entry_points"].items():
+        small = results["small"]["entry_points"][name]
+        time_exp = exponent(small["wall_s"], large["wall_s"], ratio)
+        calls_exp = exponent(sum(small["calls"].values()), sum(large["calls"].values()), ratio)
+        large["time_exponent"], large["calls_exponent"] = time_exp, calls_exp
+        regression = calls_exp > args.max_calls_exponent or (
+            args.max_time_exponent is not None and time_exp > args.max_time_exponent)
+        failed |= regression
+        print(f"{name:<16}{small['wall_s'] * 1000:>10.1f}{large['wall_s'] * 1000:>10.1f}"
+              f"{large['peak_bytes'] / 2**20:>10.1f}{sum(large['calls'].values()):>9}"
+              f"{time_exp:>7.2f}{calls_exp:>7.2f}{'  REGRESSION' if regression else ''}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Asyncio API for jackmesh.
+
+JACK calls block, so AsyncJackHandler runs them, and everything else touching its JackHandler,
+on a dedicated single-thread executor. The event loop keeps serving while a scene is applied, and
+calls on one handler never overlap. Nothing is printed: warnings and per-edge results are
+delivered as LoadEvents.
+
+    async with AsyncJackHandler() as jh:
+        plan = await jh.load("scene.toml", disconnect=True, timeout=5)
+
+        async with contextlib.aclosing(jh.load_events("other.toml")) as events:
+            async for event in events:
+                if event.kind == "edge":
+                    print(event.result)
+
+Cancelling a load, or letting it time out, stops it at the next phase boundary or before the
+next connection change, whichever comes first; the changes made so far are kept.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Tuple
+
+from . import jackmesh
+from .executor import ConnectionExecutor, EdgeResult
+from .jackmesh import ConnectionPlan, JackHandler, PlanCache, Port, PortConnection, dumps
+
+
+class LoadEvent:
+    """
+    Progress of an asynchronous load.
+
+    ``kind`` is one of:
+        "warning": A spec matched no port; ``message`` says which.
+        "plan":    The changes were computed; ``plan`` holds them. Sent before anything is applied.
+        "edge":    One connect or disconnect finished; ``result`` is its EdgeResult.
+        "done":    The load is complete; ``plan.report`` holds all results unless it was a dry run.
+    """
+
+    __slots__ = ("kind", "message", "plan", "result")
+
+    def __init__(self, kind: str, message: Optional[str] = None, plan: Optional[ConnectionPlan] = None,
+                 result: Optional[EdgeResult] = None):
+        self.kind = kind
+        self.message = message
+        self.plan = plan
+        self.result = result
+
+    def __repr__(self) -> str:
+        detail = self.message or self.result or self.plan
+        return f"LoadEvent(kind='{self.kind}', {detail!r})"
+
+
+class AsyncJackHandler:
+    """
+    Async wrapper around a JackHandler.
+
+    Args:
+        server_name: The JACK server to connect to on ``open``. Defaults to the default server.
+        jh: An existing handler to wrap instead of opening a new one. It must not be used from
+            other threads while wrapped.
+
+    Resolved plans are cached in ``plan_cache`` between loads, like the daemon does.
+    """
+
+    def __init__(self, server_name: Optional[str] = None, jh: Optional[JackHandler] = None):
+        self.server_name = server_name
+        self.jh = jh
+        self._own_handler = jh is None
+        self.plan_cache = PlanCache()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jackmesh")
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def open(self) -> 'AsyncJackHandler':
+        """Open the JACK client, unless a handler was given."""
+        if self.jh is None:
+            self.jh = await self._run(JackHandler, self.server_name)
+        return self
+
+    async def close(self):
+        """Close the JACK client if this wrapper opened it, and stop the executor."""
+        if self.jh is not None and self._own_handler:
+            await self._run(self.jh.close)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> 'AsyncJackHandler':
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def enable_tracking(self):
+        await self._run(self.jh.enable_tracking)
+
+    async def get_jack_ports(self) -> List[Port]:
+        return await self._run(self.jh.get_jack_ports)
+
+    async def refresh_ports(self) -> List[Port]:
+        return await self._run(self.jh.refresh_ports)
+
+    async def get_jack_connections(self, backend="jacklib") -> List[PortConnection]:
+        return await self._run(self.jh.get_jack_connections, backend)
+
+    async def dump(self, connections_backend="jacklib", since: Optional[Iterable[Tuple[str, str]]] = None) -> str:
+        """Return the current connections as TOML, see ``jackmesh.iter_dump``."""
+        return await self._run(dumps, self.jh, connections_backend=connections_backend, since=since)
+
+    async def load(self, config_path, regex_matching=False, disconnect=False, connections_backend="jacklib",
+                   dry_run=False, workers=1, retries=2, use_cache=True, transactional=False,
+                   timeout: Optional[float] = None) -> ConnectionPlan:
+        """
+        Apply a config like ``jackmesh.load`` and return the plan, with ``plan.report`` once applied.
+
+        Raises TimeoutError if the load takes longer than ``timeout`` seconds; it is stopped then.
+        """
+        plan = None
+        async with asyncio.timeout(timeout):
+            async for event in self.load_events(config_path, regex_matching=regex_matching, disconnect=disconnect,
+                                                connections_backend=connections_backend, dry_run=dry_run,
+                                                workers=workers, retries=retries, use_cache=use_cache,
+                                                transactional=transactional):
+                if event.kind == "done":
+                    plan = event.plan
+        return plan
+
+    async def load_events(self, config_path, regex_matching=False, disconnect=False, connections_backend="jacklib",
+                          dry_run=False, workers=1, retries=2, use_cache=True,
+                          transactional=False) -> AsyncIterator[LoadEvent]:
+        """
+        Apply a config with ``jackmesh.load`` and yield LoadEvents as it progresses, ending with a
+        "done" event.
+
+        Closing the iterator early, cancelling the consuming task or a surrounding
+        ``asyncio.timeout`` stops the load before its next connection change.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancel = threading.Event()
+
+        def emit(event: LoadEvent):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        job = loop.run_in_executor(self._executor, functools.partial(
+            self._load_blocking, emit, cancel, config_path, regex_matching, disconnect, connections_backend,
+            dry_run, workers, retries, use_cache, transactional))
+        # Events are queued with call_soon_threadsafe before the job's result is, so None comes last.
+        job.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+            await job
+        finally:
+            cancel.set()
+
+    def _load_blocking(self, emit: Callable[[LoadEvent], None], cancel: threading.Event, config_path, regex_matching,
+                       disconnect, connections_backend, dry_run, workers, retries, use_cache, transactional):
+        self.jh.refresh_ports()
+        plan = jackmesh.load(config_path, regex_matching=regex_matching, disconnect=disconnect,
+                             connections_backend=connections_backend, dry_run=dry_run, jh=self.jh,
+                             executor=ConnectionExecutor(workers=workers, retries=retries), use_cache=use_cache,
+                             plan_cache=self.plan_cache, transactional=transactional, log=None,
+                             warn=lambda message: emit(LoadEvent("warning", message=message)),
+                             on_plan=lambda plan: emit(LoadEvent("plan", plan=plan)),
+                             on_result=lambda result: emit(LoadEvent("edge", result=result)), cancel=cancel)
+        emit(LoadEvent("done", plan=plan))
+
+async def load(config_path, regex_matching=False, disconnect=False, connections_backend="jacklib", dry_run=False,
+               workers=1, retries=2, use_cache=True, transactional=False, server_name: Optional[str] = None,
+               timeout: Optional[float] = None) -> ConnectionPlan:
+    """Open a JACK client, apply a config with ``AsyncJackHandler.load`` and close the client again."""
+    async with asyncio.timeout(timeout):
+        async with AsyncJackHandler(server_name) as jh:
+            return await jh.load(config_path, regex_matching=regex_matching, disconnect=disconnect,
+                                 connections_backend=connections_backend, dry_run=dry_run, workers=workers,
+                                 retries=retries, use_cache=use_cache, transactional=transactional)
+
+
+async def dump(connections_backend="jacklib", since: Optional[Iterable[Tuple[str, str]]] = None,
+               server_name: Optional[str] = None, timeout: Optional[float] = None) -> str:
+    """Open a JACK client, return its connections as TOML and close the client again."""
+    async with asyncio.timeout(timeout):
+        async with AsyncJackHandler(server_name) as jh:
+            return await jh.dump(connections_backend=connections_backend, since=since)
@@ -0,0 +1,154 @@
+"""
+Long-running jackmesh daemon.
+
+The daemon owns a single JackHandler for its whole lifetime and serves load/dump requests from
+thin clients over a Unix domain socket, so a scene switch only costs the diff and apply instead
+of opening a JACK client and enumerating every port first.
+
+The protocol is one JSON object per line in each direction. The client sends one request, the
+daemon answers with one response and closes the connection:
+
+    {"command": "load", "config_path": "/abs/scene.toml", "regex_matching": true, "disconnect": true}
+    {"command": "dump", "since": "/abs/previous_dump.toml"}
+    {"command": "ping"}
+
+``since`` is optional and limits the dump to the changes since an earlier dump. Responses carry
+whatever the command printed and, for load, a summary of the plan:
+
+    {"ok": true, "output": "...", "plan": {"connect": 2, "disconnect": 1, "unchanged": 40, "not_found": 0, "failed": 0}}
+    {"ok": false, "output": "...", "error": "..."}
+"""
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+from typing import Dict, Optional
+
+from .jackmesh import JackHandler, PlanCache, config_edges, dumps, load
+
+
+def default_socket_path() -> str:
+    """Return the per-user socket path, in ``$XDG_RUNTIME_DIR`` if set."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "jackmesh.sock")
+    return os.path.join(tempfile.gettempdir(), f"jackmesh-{os.getuid()}.sock")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {"ok": False, "output": "", "error": f"Malformed request: {e}"}
+        else:
+            response = self.server.jackmesh_daemon.handle_request(request)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class JackmeshDaemon:
+    """
+    Serves load/dump requests against one long-lived JackHandler.
+
+    Requests are handled one at a time, since the JACK server serializes graph changes anyway.
+    The daemon's own handler tracks the graph through JACK notifications, so ports and connections
+    are known without rescanning; ``JackHandler.refresh_ports`` only does work if tracking lost
+    track of the graph. Resolved scenes are kept in a PlanCache, so switching back to a scene while
+    the set of ports is unchanged goes straight to the diff.
+    """
+
+    def __init__(self, jh: Optional[JackHandler] = None, connections_backend="jacklib", server_name: Optional[str] = None):
+        if jh is None:
+            jh = JackHandler(server_name)
+            jh.enable_tracking()
+        self.jh = jh
+        self.connections_backend = connections_backend
+        self.plan_cache = PlanCache()
+
+    def handle_request(self, request: Dict) -> Dict:
+        """Run one request and return its response."""
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = self._dispatch(request)
+        except Exception as e:
+            return {"ok": False, "output": output.getvalue(), "error": str(e)}
+        return {"ok": True, "output": output.getvalue(), **result}
+
+    def _dispatch(self, request: Dict) -> Dict:
+        command = request.get("command")
+        if command == "ping":
+            return {}
+        elif command == "load":
+            self.jh.refresh_ports()
+            try:
+                plan = load(request["config_path"],
+                            regex_matching=request.get("regex_matching", False),
+                            disconnect=request.get("disconnect", False),
+                            connections_backend=self.connections_backend,
+                            dry_run=request.get("dry_run", False),
+                            transactional=request.get("transactional", False),
+                            jh=self.jh,
+                            plan_cache=self.plan_cache)
+            except Exception:
+                # A partly applied plan leaves the graph in an unknown state; rescan next time.
+                self.jh.invalidate()
+                raise
+            return {"plan": plan.summary()}
+        elif command == "dump":
+            self.jh.refresh_ports()
+            since = config_edges(request["since"]) if request.get("since") else None
+            print(dumps(self.jh, connections_backend=self.connections_backend, since=since), end="")
+            return {}
+        raise ValueError(f"Unknown command: {command}")
+
+    def make_server(self, socket_path: str) -> socketserver.UnixStreamServer:
+        """Bind the daemon to ``socket_path``, replacing a stale socket left by a dead daemon."""
+        if os.path.exists(socket_path):
+            try:
+                send_request({"command": "ping"}, socket_path, timeout=1)
+            except OSError:
+                os.unlink(socket_path)
+            else:
+                raise RuntimeError(f"A jackmesh daemon is already listening on {socket_path}")
+
+        server = socketserver.UnixStreamServer(socket_path, _RequestHandler)
+        server.jackmesh_daemon = self
+        return server
+
+    def serve(self, socket_path: Optional[str] = None):
+        """Serve requests until interrupted (SIGINT/SIGTERM), then clean up the socket and client."""
+        socket_path = socket_path or default_socket_path()
+        server = self.make_server(socket_path)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        print(f"jackmesh daemon listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.jh.close()
+
+
+def send_request(request: Dict, socket_path: Optional[str] = None, timeout: Optional[float] = None) -> Dict:
+    """Send one request to a running daemon and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+
+    if not line:
+        raise RuntimeError("jackmesh daemon closed the connection without responding")
+    return json.loads(line)
@@ -0,0 +1,295 @@
+"""
+Apply engine for connection plans.
+
+The JACK server serializes graph changes, so by default operations run one after another in
+the calling thread. A worker pool can be enabled to compare strategies on a given server; work
+is then handed out in batches rather than one future per edge. Either way, every edge gets a
+result in plan order, failures are retried and reported instead of aborting the run, and log
+lines are buffered so output doesn't interleave.
+
+A transaction instead runs all or nothing: the first operation that still fails after its retries
+stops it, and every change made so far is undone, newest first.
+"""
+import errno
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from jackmesh import profiling
+
+
+class EdgeResult:
+    """
+    The outcome of one connect or disconnect operation.
+
+    ``existed`` is True for a connect that found the connection already made, e.g. by another
+    client since the plan was made. It counts as done, but changed nothing.
+    """
+
+    __slots__ = ("action", "connection", "error", "attempts", "duration", "existed")
+
+    def __init__(self, action: str, connection, error: Optional[Exception], attempts: int, duration: float,
+                 existed: bool = False):
+        self.action = action
+        self.connection = connection
+        self.error = error
+        self.attempts = attempts
+        self.duration = duration
+        self.existed = existed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return (f"EdgeResult(action='{self.action}', output='{self.connection.output.name}', "
+                f"input='{self.connection.input.name}', ok={self.ok}, attempts={self.attempts})")
+
+
+class ApplyReport:
+    """
+    Per-edge results, buffered log lines and timing stats of one executor run.
+
+    After a transaction, ``rollback`` holds the operations that undid its changes if it was rolled
+    back, and ``mutation_window`` the seconds from the start of the first change to the end of
+    the last one, undo operations included.
+    """
+
+    def __init__(self):
+        self.results: List[EdgeResult] = []
+        self.log: List[str] = []
+        self.timings: Dict[str, float] = {}
+        self.cancelled = False
+        self.rolled_back = False
+        self.rollback: List[EdgeResult] = []
+        self.mutation_window: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    @property
+    def failures(self) -> List[EdgeResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def rollback_ok(self) -> bool:
+        return all(result.ok for result in self.rollback)
+
+    def succeeded(self, action: str) -> List:
+        """Return the connections for which ``action`` ("connect" or "disconnect") succeeded and wasn't undone."""
+        done = [result.connection for result in self.results if result.ok and result.action == action]
+        if self.rollback:
+            undone = {result.connection for result in self.rollback if result.ok}
+            done = [connection for connection in done if connection not in undone]
+        return done
+
+    @property
+    def retried(self) -> int:
+        return sum(result.attempts - 1 for result in self.results)
+
+    def stats(self) -> Dict[str, float]:
+        """Return counts and timings suitable for comparing executor settings."""
+        durations = [result.duration for result in self.results]
+        total = sum(self.timings.values())
+        return {
+            "edges": len(self.results),
+            "failed": len(self.failures),
+            "retries": self.retried,
+            "total_s": total,
+            "edge_mean_s": sum(durations) / len(durations) if durations else 0.0,
+            "edge_max_s": max(durations, default=0.0),
+            "edges_per_s": len(self.results) / total if total else 0.0,
+            **{f"{phase}_s": seconds for phase, seconds in self.timings.items()},
+            **({"mutation_window_s": self.mutation_window, "rolled_back": len(self.rollback)}
+               if self.mutation_window is not None else {}),
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        summary = (f"{stats['edges']} edges in {stats['total_s'] * 1000:.1f} ms "
+                   f"({stats['edges_per_s']:.0f}/s, {stats['failed']} failed, {stats['retries']} retries)")
+        if self.mutation_window is not None:
+            summary += f", mutation window {self.mutation_window * 1000:.1f} ms"
+        if self.rolled_back:
+            summary += f", rolled back {len(self.rollback)} change(s)"
+            if not self.rollback_ok:
+                summary += f" with {sum(not result.ok for result in self.rollback)} failure(s)"
+        return summary
+
+
+# Error codes of operations that may succeed if tried again. libjack's jack_connect and
+# jack_disconnect report every failure but an existing connection as -1, so with the real server
+# nothing is retried by default; the codes matter for backends that report them, and a custom
+# ``retry_if`` can opt into retrying -1.
+TRANSIENT_ERRORS = frozenset({errno.EAGAIN, errno.EBUSY, errno.EINTR, errno.ETIMEDOUT})
+
+
+def is_transient(error: Exception) -> bool:
+    """Default retry policy: only errors whose code is in TRANSIENT_ERRORS are retried."""
+    return getattr(error, "code", None) in TRANSIENT_ERRORS
+
+
+class ConnectionExecutor:
+    """
+    Runs disconnect and connect operations and collects an ApplyReport.
+
+    Args:
+        workers: 1 runs everything sequentially in the calling thread, in plan order. More
+                 workers run batches concurrently on a thread pool.
+        batch_size: Number of operations handed to a worker at a time.
+        retries: How often a failed operation is retried if ``retry_if`` considers it transient.
+        retry_delay: Seconds to wait before the first retry; doubled for each further retry.
+        retry_if: Predicate deciding whether an error is worth retrying.
+        on_result: Called with every EdgeResult as soon as the operation is done, from the thread
+                   that ran it.
+        cancel: Once this event is set, no further operations are started. The report then only
+                holds the operations done so far and ``report.cancelled`` is True.
+    """
+
+    def __init__(self, workers: int = 1, batch_size: int = 64, retries: int = 2, retry_delay: float = 0.01,
+                 retry_if: Callable[[Exception], bool] = is_transient,
+                 on_result: Optional[Callable[[EdgeResult], None]] = None, cancel: Optional[threading.Event] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.retry_if = retry_if
+        self.on_result = on_result
+        self.cancel = cancel
+
+    def run(self, disconnects: Iterable = (), connects: Iterable = ()) -> ApplyReport:
+        """Disconnect first, then connect. Never raises for failed operations, see the report."""
+        report = ApplyReport()
+        pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for phase, action, connections in (("disconnect", "disconnect", disconnects),
+                                               ("connect", "connect", connects)):
+                connections = list(connections)
+                start = time.perf_counter()
+                with profiling.phase(f"apply_{phase}"):
+                    report.results.extend(self._run_phase(pool, action, connections))
+                report.timings[phase] = time.perf_counter() - start
+                profiling.count(f"{action}_ops", len(connections))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        report.cancelled = self.cancel is not None and self.cancel.is_set()
+        for result in report.results:
+            report.log.append(self._describe(result))
+        profiling.count("failed_ops", len(report.failures))
+        profiling.count("retries", report.retried)
+        return report
+
+    def run_transaction(self, steps: Iterable[Tuple[str, Iterable]]) -> ApplyReport:
+        """
+        Run ``(action, connections)`` steps in order, all or nothing.
+
+        Transactions always run sequentially in the calling thread, so that the journal of applied
+        changes is exact. If an operation fails after its retries, or ``cancel`` is set, the
+        remaining ones are skipped and the journal is undone newest first: connections made are
+        disconnected and connections removed are made again. ``report.rolled_back`` is then True.
+        """
+        report = ApplyReport()
+        journal: List[EdgeResult] = []
+        first_start = last_end = None
+        for action, connections in steps:
+            connections = list(connections)
+            start = time.perf_counter()
+            with profiling.phase(f"apply_{action}"):
+                for connection in connections:
+                    if self.cancel is not None and self.cancel.is_set():
+                        report.cancelled = report.rolled_back = True
+                        break
+                    op_start = time.perf_counter()
+                    result = self._run_one(action, connection)
+                    first_start = op_start if first_start is None else first_start
+                    last_end = time.perf_counter()
+                    if self.on_result is not None:
+                        self.on_result(result)
+                    report.results.append(result)
+                    if not result.ok:
+                        report.rolled_back = True
+                        break
+                    # A connection someone else made is not ours to undo.
+                    if not result.existed:
+                        journal.append(result)
+            report.timings[action] = report.timings.get(action, 0.0) + time.perf_counter() - start
+            profiling.count(f"{action}_ops", len(connections))
+            if report.rolled_back:
+                break
+
+        if report.rolled_back and journal:
+            start = time.perf_counter()
+            with profiling.phase("rollback"):
+                for done in reversed(journal):
+                    undo = "disconnect" if done.action == "connect" else "connect"
+                    result = self._run_one(undo, done.connection)
+                    if self.on_result is not None:
+                        self.on_result(result)
+                    report.rollback.append(result)
+            last_end = time.perf_counter()
+            report.timings["rollback"] = last_end - start
+        report.mutation_window = last_end - first_start if first_start is not None else 0.0
+
+        for result in report.results:
+            report.log.append(self._describe(result))
+        for result in report.rollback:
+            report.log.append("Rolling back: " + self._describe(result))
+        profiling.count("failed_ops", len(report.failures))
+        profiling.count("retries", report.retried)
+        return report
+
+    def _run_phase(self, pool: Optional[ThreadPoolExecutor], action: str, connections: Sequence) -> List[EdgeResult]:
+        batches = [connections[i:i + self.batch_size] for i in range(0, len(connections), self.batch_size)]
+        if pool is None:
+            return [result for batch in batches for result in self._run_batch(action, batch)]
+        # map() keeps batch order, so results come back in plan order whatever finishes first.
+        return [result for results in pool.map(lambda batch: self._run_batch(action, batch), batches)
+                for result in results]
+
+    def _run_batch(self, action: str, batch: Sequence) -> List[EdgeResult]:
+        results = []
+        for connection in batch:
+            if self.cancel is not None and self.cancel.is_set():
+                break
+            result = self._run_one(action, connection)
+            if self.on_result is not None:
+                self.on_result(result)
+            results.append(result)
+        return results
+
+    def _run_one(self, action: str, connection) -> EdgeResult:
+        start = time.perf_counter()
+        attempts = 0
+        delay = self.retry_delay
+        while True:
+            attempts += 1
+            try:
+                getattr(connection, action)()
+                error = None
+            except Exception as e:
+                error = e
+            if action == "connect" and getattr(error, "code", None) == errno.EEXIST:
+                return EdgeResult(action, connection, None, attempts, time.perf_counter() - start, existed=True)
+            if error is None or attempts > self.retries or not self.retry_if(error):
+                return EdgeResult(action, connection, error, attempts, time.perf_counter() - start)
+            time.sleep(delay)
+            delay *= 2
+
+    @staticmethod
+    def _describe(result: EdgeResult) -> str:
+        output, input = result.connection.output.name, result.connection.input.name
+        if result.action == "disconnect":
+            message = f"Disconnecting {output} from {input}..."
+        else:
+            message = f"Connecting {output} to {input}..."
+        if result.existed:
+            message += " already connected"
+        if not result.ok:
+            message += f" failed after {result.attempts} attempt(s): {result.error}"
+        return message
@@ -0,0 +1,349 @@
+"""
+An in-process fake JACK server for tests and benchmarks.
+
+FakeJackServer implements the part of the jacklib API that jackmesh uses, over an in-memory
+graph. While installed, JackHandler, Port and PortConnection talk to it instead of libjack:
+
+    server = FakeJackServer.synthetic(clients=50, ports_per_client=32, fanout=2)
+    with server.installed():
+        dump()
+    print(server.calls)
+
+Every API call is counted per function name and can be slowed down by ``call_latency``
+seconds to simulate the round trip to a real server. Port registration and connection changes
+fire the registered notification callbacks, synchronously in the calling thread.
+
+For code that only needs a port list, ``offline_handler`` makes a JackHandler without any server.
+"""
+import contextlib
+import errno
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+from unittest.mock import MagicMock
+
+JackNoStartServer = 0x01
+JackServerName = 0x04
+JackNameNotUnique = 0x04
+JackServerStarted = 0x08
+JackPortIsInput = 0x1
+JackPortIsOutput = 0x2
+JackPortIsPhysical = 0x4
+JackPortIsTerminal = 0x10
+JackCaptureLatency = 0
+JackPlaybackLatency = 1
+
+AUDIO_TYPE = "32 bit float mono audio"
+MIDI_TYPE = "8 bit raw midi"
+
+
+class jack_status_t:
+    def __init__(self):
+        self.value = 0
+
+
+class jack_latency_range_t:
+    def __init__(self):
+        self.min = 0
+        self.max = 0
+
+
+class FakePort:
+    """A port of the fake server. Instances double as the opaque port pointers handed to jackmesh."""
+
+    __slots__ = ("id", "name", "flags", "type", "aliases", "latency", "connections")
+
+    def __init__(self, port_id: int, name: str, flags: int, port_type: str = AUDIO_TYPE,
+                 aliases: Optional[List[str]] = None, latency: int = 0):
+        self.id = port_id
+        self.name = name
+        self.flags = flags
+        self.type = port_type
+        self.aliases = aliases or []
+        self.latency = latency
+        self.connections = set()
+
+
+def _api(func):
+    """Count calls to an API function and add the simulated server latency."""
+    name = func.__name__
+
+    def wrapper(self, *args, **kwargs):
+        self.calls[name] += 1
+        if self.call_latency:
+            time.sleep(self.call_latency)
+        return func(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+class FakeJackServer:
+    """
+    An in-memory JACK graph exposing the jacklib functions used by jackmesh.
+
+    Args:
+        call_latency: Seconds every API call sleeps, to simulate server round trips.
+    """
+
+    # jacklib constants, so an instance can stand in for the jacklib module.
+    JackNoStartServer = JackNoStartServer
+    JackServerName = JackServerName
+    JackNameNotUnique = JackNameNotUnique
+    JackServerStarted = JackServerStarted
+    JackPortIsInput = JackPortIsInput
+    JackPortIsOutput = JackPortIsOutput
+    JackPortIsPhysical = JackPortIsPhysical
+    JackPortIsTerminal = JackPortIsTerminal
+    JackCaptureLatency = JackCaptureLatency
+    JackPlaybackLatency = JackPlaybackLatency
+    jack_status_t = jack_status_t
+    jack_latency_range_t = jack_latency_range_t
+
+    def __init__(self, call_latency: float = 0.0):
+        self.call_latency = call_latency
+        self.calls: Counter = Counter()
+        self.ports: Dict[str, FakePort] = {}
+        self._ports_by_id: Dict[int, FakePort] = {}
+        self._next_id = 1
+        self._callbacks: Dict[str, object] = {}
+        self.server_name: Optional[str] = None
+
+    @classmethod
+    def synthetic(cls, clients: int, ports_per_client: int, fanout: int = 1, call_latency: float = 0.0) -> 'FakeJackServer':
+        """
+        Build a graph of ``clients`` clients named ``client<N>``, each with ``ports_per_client``
+        output ports ``out_<P>`` and as many input ports ``in_<P>``. Output ``out_<P>`` of a client is
+        connected to ``in_<P>`` of the next ``fanout`` clients.
+        """
+        server = cls(call_latency=call_latency)
+        for c in range(clients):
+            for p in range(ports_per_client):
+                server.register_port(f"client{c}:out_{p}", JackPortIsOutput, aliases=[f"alias{c}:capture_{p}"], latency=64)
+                server.register_port(f"client{c}:in_{p}", JackPortIsInput, aliases=[f"alias{c}:playback_{p}"], latency=64)
+        for c in range(clients):
+            for p in range(ports_per_client):
+                for k in range(1, min(fanout, clients - 1) + 1):
+                    server.add_connection(f"client{c}:out_{p}", f"client{(c + k) % clients}:in_{p}")
+        server.calls.clear()
+        return server
+
+    # --- Graph manipulation (the "other clients" side; not counted as API calls) ---
+
+    def register_port(self, name: str, flags: int, port_type: str = AUDIO_TYPE, aliases: Optional[List[str]] = None,
+                      latency: int = 0) -> FakePort:
+        port = FakePort(self._next_id, name, flags, port_type, aliases, latency)
+        self._next_id += 1
+        self.ports[name] = port
+        self._ports_by_id[port.id] = port
+        self._notify("port_registration", port.id, 1, None)
+        return port
+
+    def unregister_port(self, name: str):
+        port = self.ports[name]
+        for peer_name in list(port.connections):
+            self.remove_connection(*self._ordered(name, peer_name))
+        self._notify("port_registration", port.id, 0, None)
+        del self.ports[name]
+        del self._ports_by_id[port.id]
+
+    def rename_port(self, old_name: str, new_name: str):
+        port = self.ports.pop(old_name)
+        port.name = new_name
+        self.ports[new_name] = port
+        for peer_name in port.connections:
+            peer = self.ports[peer_name]
+            peer.connections.discard(old_name)
+            peer.connections.add(new_name)
+        self._notify("port_rename", port.id, old_name.encode(), new_name.encode(), None)
+
+    def unregister_client(self, client_name: str):
+        for name in [name for name in self.ports if name.split(":", 1)[0] == client_name]:
+            self.unregister_port(name)
+        self._notify("client_registration", client_name.encode(), 0, None)
+
+    def add_connection(self, output_name: str, input_name: str) -> int:
+        source, dest = self.ports.get(output_name), self.ports.get(input_name)
+        if source is None or dest is None or not source.flags & JackPortIsOutput or not dest.flags & JackPortIsInput:
+            return -1
+        if input_name in source.connections:
+            return errno.EEXIST
+        source.connections.add(input_name)
+        dest.connections.add(output_name)
+        self._notify("port_connect", source.id, dest.id, 1, None)
+        return 0
+
+    def remove_connection(self, output_name: str, input_name: str) -> int:
+        source, dest = self.ports.get(output_name), self.ports.get(input_name)
+        if source is None or dest is None or input_name not in source.connections:
+            return -1
+        source.connections.discard(input_name)
+        dest.connections.discard(output_name)
+        self._notify("port_connect", source.id, dest.id, 0, None)
+        return 0
+
+    def edges(self) -> set:
+        """Return all connections as ``(output name, input name)`` pairs."""
+        return {(port.name, peer) for port in self.ports.values() if port.flags & JackPortIsOutput
+                for peer in port.connections}
+
+    def jack_lsp_output(self) -> str:
+        """Render the graph the way ``jack_lsp -c`` prints it."""
+        lines = []
+        for port in self.ports.values():
+            lines.append(port.name)
+            lines.extend(f"   {peer}" for peer in sorted(port.connections))
+        return "\n".join(lines) + "\n"
+
+    def _ordered(self, name_a: str, name_b: str):
+        return (name_a, name_b) if self.ports[name_a].flags & JackPortIsOutput else (name_b, name_a)
+
+    def _notify(self, kind: str, *args):
+        callback = self._callbacks.get(kind)
+        if callback is not None:
+            callback(*args)
+
+    # --- jacklib API ---
+
+    @_api
+    def client_open(self, client_name, options, status, uuid=""):
+        # Like jacklib, the last argument is the server name if JackServerName is set.
+        self.server_name = uuid if options & JackServerName else None
+        status.value = 0
+        return self
+
+    @_api
+    def client_close(self, client):
+        self._callbacks.clear()
+        return 0
+
+    @_api
+    def activate(self, client):
+        return 0
+
+    @_api
+    def deactivate(self, client):
+        return 0
+
+    @_api
+    def set_port_registration_callback(self, client, callback, arg):
+        self._callbacks["port_registration"] = callback
+        return 0
+
+    @_api
+    def set_port_rename_callback(self, client, callback, arg):
+        self._callbacks["port_rename"] = callback
+        return 0
+
+    @_api
+    def set_client_registration_callback(self, client, callback, arg):
+        self._callbacks["client_registration"] = callback
+        return 0
+
+    @_api
+    def set_port_connect_callback(self, client, callback, arg):
+        self._callbacks["port_connect"] = callback
+        return 0
+
+    @_api
+    def get_ports(self, client, port_name_pattern=None, type_name_pattern=None, flags=0) -> List[str]:
+        """Return matching port names. The real function returns a char** for c_char_p_p_to_list."""
+        name_re = re.compile(port_name_pattern) if port_name_pattern else None
+        type_re = re.compile(type_name_pattern) if type_name_pattern else None
+        return [port.name for port in self.ports.values()
+                if (name_re is None or name_re.search(port.name))
+                and (type_re is None or type_re.search(port.type))
+                and port.flags & flags == flags]
+
+    @_api
+    def port_by_name(self, client, port_name) -> Optional[FakePort]:
+        return self.ports.get(port_name)
+
+    @_api
+    def port_by_id(self, client, port_id) -> Optional[FakePort]:
+        return self._ports_by_id.get(port_id)
+
+    @_api
+    def port_name(self, port: FakePort) -> str:
+        return port.name
+
+    @_api
+    def port_uuid(self, port: FakePort) -> int:
+        return port.id
+
+    @_api
+    def port_type(self, port: FakePort) -> str:
+        return port.type
+
+    @_api
+    def port_flags(self, port: FakePort) -> int:
+        return port.flags
+
+    @_api
+    def port_get_aliases(self, port: FakePort):
+        aliases = (port.aliases + ["", ""])[:2]
+        return (len(port.aliases), *aliases)
+
+    @_api
+    def port_get_latency_range(self, port: FakePort, mode, range_):
+        range_.min = range_.max = port.latency
+
+    @_api
+    def port_get_total_latency(self, client, port: FakePort) -> int:
+        return port.latency
+
+    @_api
+    def port_get_all_connections(self, client, port: FakePort) -> Iterator[str]:
+        return iter(sorted(port.connections))
+
+    @_api
+    def connect(self, client, source_port, destination_port) -> int:
+        return self.add_connection(source_port, destination_port)
+
+    @_api
+    def disconnect(self, client, source_port, destination_port) -> int:
+        return self.remove_connection(source_port, destination_port)
+
+    # --- Installation ---
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Make jackmesh use this server instead of libjack while the context is active."""
+        from jackmesh import jackmesh
+
+        saved = (jackmesh.jacklib, jackmesh.c_char_p_p_to_list, jackmesh.subprocess)
+        jackmesh.jacklib = self
+        jackmesh.c_char_p_p_to_list = list
+        jackmesh.subprocess = _FakeSubprocess(self)
+        try:
+            yield self
+        finally:
+            jackmesh.jacklib, jackmesh.c_char_p_p_to_list, jackmesh.subprocess = saved
+
+
+def offline_handler(ports=None):
+    """Create a JackHandler over a fixed port list, without a JACK server, fake or real."""
+    from jackmesh.jackmesh import JackHandler
+
+    jh = JackHandler.__new__(JackHandler)
+    jh.client = MagicMock()
+    jh.ports = ports
+    jh.registry = None
+    jh.tracking = False
+    jh.port_filter = (None, None, None)
+    jh.server_name = None
+    return jh
+
+
+class _FakeSubprocess:
+    """Answers ``jack_lsp -c`` for the jack_lsp connections backend."""
+
+    def __init__(self, server: FakeJackServer):
+        self.server = server
+
+    def check_output(self, cmd, text=False):
+        self.server.calls["jack_lsp"] += 1
+        output = self.server.jack_lsp_output()
+        return output if text else output.encode()
@@ -0,0 +1,109 @@
+"""
+Apply one connection config to several JACK servers at once.
+
+Each server is handled by ``load`` in a fresh worker process, with its own JACK client, so a
+rack of servers is reconfigured in the time of the slowest one rather than the sum of all. The
+config may restrict rules to one server with ``["server:<name>".<client>]`` tables; all other
+rules apply to every server. Workers print nothing; their output and plan summary come back in
+a ServerResult and are aggregated into a FanOutReport.
+"""
+import contextlib
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from .executor import ConnectionExecutor
+from .jackmesh import load
+
+
+class ServerResult:
+    """The outcome of applying the config to one JACK server."""
+
+    __slots__ = ("server", "plan", "output", "error", "duration")
+
+    def __init__(self, server: str, plan: Optional[Dict[str, int]], output: str, error: Optional[str], duration: float):
+        self.server = server
+        self.plan = plan
+        self.output = output
+        self.error = error
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not (self.plan or {}).get("failed")
+
+    def __repr__(self) -> str:
+        return f"ServerResult(server='{self.server}', ok={self.ok}, plan={self.plan}, error={self.error!r})"
+
+    def describe(self) -> str:
+        if self.error is not None:
+            return f"{self.server}: error after {self.duration * 1000:.1f} ms: {self.error}"
+        plan = self.plan
+        return (f"{self.server}: {plan['connect']} to connect, {plan['disconnect']} to disconnect, "
+                f"{plan['unchanged']} unchanged, {plan.get('failed', 0)} failed in {self.duration * 1000:.1f} ms")
+
+
+class FanOutReport:
+    """Per-server results of one fan-out run, in the order the servers were given."""
+
+    def __init__(self, results: List[ServerResult], wall_s: float):
+        self.results = results
+        self.wall_s = wall_s
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    @property
+    def failures(self) -> List[ServerResult]:
+        return [result for result in self.results if not result.ok]
+
+    def summary(self) -> str:
+        lines = [result.describe() for result in self.results]
+        slowest = max((result.duration for result in self.results), default=0.0)
+        lines.append(f"{len(self.results)} servers in {self.wall_s * 1000:.1f} ms "
+                     f"(slowest {slowest * 1000:.1f} ms, {len(self.failures)} failed)")
+        return "\n".join(lines)
+
+
+def _load_on_server(server: str, config_path: str, options: Dict, workers: int, retries: int) -> ServerResult:
+    """Worker process entry point: run ``load`` against one server and capture what it prints."""
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            plan = load(config_path, server_name=server,
+                        executor=ConnectionExecutor(workers=workers, retries=retries), **options)
+    except Exception as e:
+        return ServerResult(server, None, output.getvalue(), str(e) or type(e).__name__, time.perf_counter() - start)
+    return ServerResult(server, plan.summary(), output.getvalue(), None, time.perf_counter() - start)
+
+
+def fan_out(config_path, servers: Sequence[str], regex_matching=False, disconnect=False, connections_backend="jacklib",
+            dry_run=False, use_cache=True, workers=1, retries=2, mp_context=None, transactional=False,
+            initializer=None, initargs=()) -> FanOutReport:
+    """
+    Load a config into every server of ``servers`` in parallel, one worker process per server.
+
+    The keyword arguments up to ``use_cache`` and ``transactional`` are passed on to ``load``;
+    a transaction rolls back only its own server. ``workers`` and ``retries``
+    configure each server's ConnectionExecutor. Every server gets a worker process of its own, so
+    no libjack state carries over from one server to the next; ``initializer(*initargs)`` runs in
+    each of them first. ``mp_context`` selects the multiprocessing start method of the worker pool,
+    which can't be "fork". A server that can't be reached or fails doesn't affect the others.
+    """
+    options = {"regex_matching": regex_matching, "disconnect": disconnect, "connections_backend": connections_backend,
+               "dry_run": dry_run, "use_cache": use_cache, "transactional": transactional}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, len(servers)), mp_context=mp_context, initializer=initializer,
+                             initargs=initargs, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(_load_on_server, server, config_path, options, workers, retries) for server in servers]
+        results = []
+        for server, future in zip(servers, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The worker process itself died, e.g. in libjack.
+                results.append(ServerResult(server, None, "", f"Worker failed: {e}", time.perf_counter() - start))
+    return FanOutReport(results, time.perf_counter() - start)
@@ -1,38 +1,137 @@
 import subprocess
 import toml
 import argparse
+import contextlib
 import os
+import functools
+import hashlib
+import itertools
+import marshal
 import re
 import sys
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from array import array
+from collections import OrderedDict
 from typing import List, Literal
 import jacklib
 from jacklib.helpers import c_char_p_p_to_list, get_jack_status_error_string
 
+from jackmesh import profiling
+from jackmesh.executor import ApplyReport, ConnectionExecutor, EdgeResult
+
 import subprocess
 from typing import List, Dict
 
 import subprocess
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Set, Iterable, Iterator, FrozenSet, Callable
 from typing import Optional
 
 
+# Marks a Port attribute that is queried from the server on first access.
+LAZY = object()
+
+# Source of Port.id, unique within the process.
+_port_ids = itertools.count()
+
+
 class Port:
+    """
+    A JACK port.
+
+    ``uuid``, ``aliases`` and the latency attributes each take one or more extra server queries.
+    When passed as ``LAZY`` they are queried on first access and then cached.
+
+    Names are interned, and every port gets a small integer ``id`` that identifies it within the
+    process, e.g. in an EdgeTable. ``flags`` are the JACK port flags.
+    """
+
+    __slots__ = ("id", "port_ptr", "name", "client", "client_ptr", "port_name", "port_type", "_uuid", "direction",
+                 "_aliases", "_in_latency", "_out_latency", "_total_latency", "flags")
 
     def __init__(self, port_ptr, name: str, client: str, client_ptr, port_name: str, port_type: str, uuid: str, direction: str,
-                 aliases: List[str], in_latency: int, out_latency: int, total_latency: int):
+                 aliases: List[str], in_latency: int, out_latency: int, total_latency: int, port_id: Optional[int] = None,
+                 flags: int = 0):
+        self.id = next(_port_ids) if port_id is None else port_id
+        self.flags = flags
         self.port_ptr = port_ptr
-        self.name = name
-        self.client = client
+        self.name = sys.intern(name)
+        self.client = sys.intern(client)
         self.client_ptr = client_ptr
-        self.port_name = port_name
-        self.port_type = port_type
-        self.uuid = uuid
+        self.port_name = sys.intern(port_name)
+        self.port_type = sys.intern(port_type) if isinstance(port_type, str) else port_type
+        self._uuid = uuid
         self.direction = direction
-        self.aliases = aliases
-        self.in_latency = in_latency
-        self.out_latency = out_latency
-        self.total_latency = total_latency
+        self._aliases = aliases
+        self._in_latency = in_latency
+        self._out_latency = out_latency
+        self._total_latency = total_latency
+
+    @property
+    def uuid(self) -> str:
+        if self._uuid is LAZY:
+            self._uuid = jacklib.port_uuid(self.port_ptr)
+        return self._uuid
+
+    @uuid.setter
+    def uuid(self, value: str):
+        self._uuid = value
+
+    @property
+    def aliases(self) -> List[str]:
+        if self._aliases is LAZY:
+            self._aliases = list(jacklib.port_get_aliases(self.port_ptr)[1:])
+        return self._aliases
+
+    @aliases.setter
+    def aliases(self, value: List[str]):
+        self._aliases = value
+
+    def _latency_range_min(self, mode) -> int:
+        latency_range = jacklib.jack_latency_range_t()
+        jacklib.port_get_latency_range(self.port_ptr, mode, latency_range)
+        return latency_range.min  # or latency_range.max based on the range specifics
+
+    @property
+    def in_latency(self) -> int:
+        if self._in_latency is LAZY:
+            self._in_latency = self._latency_range_min(jacklib.JackCaptureLatency)
+        return self._in_latency
+
+    @in_latency.setter
+    def in_latency(self, value: int):
+        self._in_latency = value
+
+    @property
+    def out_latency(self) -> int:
+        if self._out_latency is LAZY:
+            self._out_latency = self._latency_range_min(jacklib.JackPlaybackLatency)
+        return self._out_latency
+
+    @out_latency.setter
+    def out_latency(self, value: int):
+        self._out_latency = value
+
+    @property
+    def total_latency(self) -> int:
+        if self._total_latency is LAZY:
+            self._total_latency = jacklib.port_get_total_latency(self.client_ptr, self.port_ptr)
+        return self._total_latency
+
+    @total_latency.setter
+    def total_latency(self, value: int):
+        self._total_latency = value
+
+    def renamed(self, new_name: str) -> 'Port':
+        """Return a copy of this port under a new full name, keeping its id and not loading lazy attributes."""
+        client, port_short_name = new_name.split(":", 1)
+        return Port(self.port_ptr, new_name, client, self.client_ptr, port_short_name, self.port_type, self._uuid,
+                    self.direction, self._aliases, self._in_latency, self._out_latency, self._total_latency,
+                    port_id=self.id, flags=self.flags)
+
+    @property
+    def is_endpoint(self) -> bool:
+        """Whether signal enters or leaves the graph here: the port is physical or terminal."""
+        return bool(self.flags & (jacklib.JackPortIsPhysical | jacklib.JackPortIsTerminal))
 
     def __repr__(self) -> str:
         return f"Port(name='{self.name}', client='{self.client}', port_name='{self.port_name}', type='{self.port_type}', uuid='{self.uuid}', direction='{self.direction}', aliases={self.aliases}, in_latency={self.in_latency}, out_latency={self.out_latency}, total_latency={self.total_latency})"
@@ -43,7 +142,184 @@ class Port:
     def __hash__(self):
         return hash(self.uuid)
 
+# Characters that end the literal prefix of a port regex.
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_port_regex(port_regex: str) -> re.Pattern:
+    return re.compile(port_regex)
+
+
+def _regex_literal_prefix(port_regex: str) -> str:
+    """Return the literal text every name matched by ``port_regex`` must start with ("" if unknown)."""
+    if "|" in port_regex:
+        # Alternation can make any branch match, so there is no common prefix to rely on.
+        return ""
+    prefix = []
+    for ch in port_regex:
+        if ch in _REGEX_META:
+            # A quantifier that allows zero repetitions makes the preceding character optional.
+            if ch in "*?{" and prefix:
+                prefix.pop()
+            break
+        prefix.append(ch)
+    return "".join(prefix)
+
+
+# Prefixes selecting how a port spec is matched; specs without one are exact port names.
+_SPEC_KINDS = ("regex", "alias", "uuid")
+
+
+def _parse_port_spec(port_spec: str) -> Tuple[str, str]:
+    """
+    Split a port spec into its kind ("name", "regex", "alias" or "uuid") and the value to match.
+
+    The prefix either starts the spec or follows its client part, as in the keys of a client table
+    (``client:regex:out.*``), and is removed once. For regexes and aliases the client part stays
+    part of the value; a UUID stands on its own. Specs that only look prefixed are port names:
+    ``uuid:in`` is a port of a client called "uuid", since UUIDs are numbers, and so is
+    ``alias:out``, since aliases are full ``client:port`` names.
+    """
+    client, separator, rest = port_spec.partition(":")
+    for kind in _SPEC_KINDS:
+        marker = kind + ":"
+        if port_spec.startswith(marker):
+            value = port_spec[len(marker):]
+        elif separator and rest.startswith(marker):
+            value = rest[len(marker):] if kind == "uuid" else f"{client}:{rest[len(marker):]}"
+        else:
+            continue
+        if (kind == "uuid" and not value.isdigit()) or (kind == "alias" and ":" not in value):
+            continue
+        return kind, value
+    return "name", port_spec
+
+
+class PortRegistry:
+    """Hash indexes over one snapshot of ports, so lookups don't have to scan the port list."""
+
+    def __init__(self, ports: List[Port]):
+        self.ports = ports
+        self.by_name: Dict[str, Port] = {}
+        self.by_id: Dict[int, Port] = {}
+        self.by_client: Dict[str, List[Port]] = {}
+        self.by_direction_type: Dict[Tuple[str, str], List[Port]] = {}
+
+        for port in ports:
+            self.by_name[port.name] = port
+            self.by_id[port.id] = port
+            self.by_client.setdefault(port.client, []).append(port)
+            self.by_direction_type.setdefault((port.direction, port.port_type), []).append(port)
+
+        self.client_names = sorted(self.by_client)
+        self._regex_matches: Dict[Tuple[str, Optional[str]], List[Port]] = {}
+        # UUIDs and aliases may be lazy port attributes, so these indexes are built on first use.
+        self._by_uuid: Optional[Dict[str, Port]] = None
+        self._by_alias: Optional[Dict[str, Port]] = None
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def by_uuid(self) -> Dict[str, Port]:
+        if self._by_uuid is None:
+            # jacklib returns numeric UUIDs, configs spell them as strings; index both the same way.
+            self._by_uuid = {str(port.uuid): port for port in self.ports}
+        return self._by_uuid
+
+    @property
+    def by_alias(self) -> Dict[str, Port]:
+        if self._by_alias is None:
+            by_alias = {}
+            for port in self.ports:
+                for alias in port.aliases:
+                    # jacklib hands back blank buffers for unset alias slots
+                    if alias and alias.strip():
+                        by_alias[alias] = port
+            self._by_alias = by_alias
+        return self._by_alias
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A digest of the name, direction and ``Port.id`` of every port, in order.
+
+        Registries with the same fingerprint hold the same Port instances under the same names, so
+        whatever was resolved against one is valid for the other. ``Port.id`` stands in for the JACK
+        UUID, which is a lazy attribute and would cost a server call per port.
+        """
+        if self._fingerprint is None:
+            entries = "".join(f"{port.id}\t{port.direction}\t{port.name}\n" for port in self.ports)
+            self._fingerprint = hashlib.blake2b(entries.encode(), digest_size=16).hexdigest()
+        return self._fingerprint
+
+    def __len__(self) -> int:
+        return len(self.ports)
+
+    def get(self, name: str) -> Optional[Port]:
+        return self.by_name.get(name)
+
+    def get_by_client(self, client_name: str) -> List[Port]:
+        return self.by_client.get(client_name, [])
+
+    def get_by_uuid(self, uuid) -> Optional[Port]:
+        return self.by_uuid.get(str(uuid))
+
+    def get_by_alias(self, alias: str) -> Optional[Port]:
+        return self.by_alias.get(alias)
+
+    def get_by_direction(self, direction: str, port_type: Optional[str] = None) -> List[Port]:
+        if port_type is not None:
+            return self.by_direction_type.get((direction, port_type), [])
+        return [port for (d, _), ports in self.by_direction_type.items() if d == direction for port in ports]
+
+    def match_regex(self, port_regex: str, direction: Optional[str] = None) -> List[Port]:
+        """Return the ports whose full name matches ``port_regex`` (anchored at the start, like ``re.match``).
+
+        Results are memoized per pattern and direction for the lifetime of this snapshot. Before the
+        regex runs, candidates are narrowed to the clients named by the pattern's literal prefix.
+        """
+        key = (port_regex, direction)
+        matches = self._regex_matches.get(key)
+        if matches is None:
+            pattern = _compile_port_regex(port_regex)
+            matches = [port for port in self._regex_candidates(port_regex, direction) if pattern.match(port.name)]
+            self._regex_matches[key] = matches
+        return matches
+
+    def _regex_candidates(self, port_regex: str, direction: Optional[str]) -> List[Port]:
+        prefix = _regex_literal_prefix(port_regex)
+        if ":" in prefix:
+            candidates = self.get_by_client(prefix.split(":", 1)[0])
+        elif prefix:
+            candidates = [port for client, ports in self.by_client.items() if client.startswith(prefix)
+                          for port in ports]
+        elif direction is not None:
+            return self.get_by_direction(direction)
+        else:
+            return self.ports
+
+        if direction is not None:
+            candidates = [port for port in candidates if port.direction == direction]
+        return candidates
+
+
+class JackConnectionError(Exception):
+    """Raised when the JACK server refuses to connect or disconnect two ports. ``code`` is JACK's return value."""
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
 class PortConnection:
+    """
+    A connection from an output port to an input port.
+
+    Connections compare by the names of their ports. The hash is computed once, so the ports of
+    a connection should not be replaced after it has been put into a set.
+    """
+
+    __slots__ = ("client", "output", "input", "_hash")
 
     def __init__(self, client, output: Optional['Port'] = None, input: Optional['Port'] = None):
         self.client = client
@@ -54,6 +330,7 @@ class PortConnection:
 
         self.output = output  # Output port
         self.input = input    # Input port
+        self._hash = None
 
     def __repr__(self) -> str:
         return f"PortConnection(output={self.output}, input={self.input})"
@@ -64,14 +341,16 @@ class PortConnection:
         return self.output.name == other.output.name and self.input.name == other.input.name
 
     def __hash__(self):
-        return hash((self.output.name, self.input.name))
+        if self._hash is None:
+            self._hash = hash((self.output.name, self.input.name))
+        return self._hash
 
     def disconnect(self):
         status = jacklib.jack_status_t()
         result = jacklib.disconnect(self.client, self.output.name, self.input.name)
         if result != 0:
-            error_msg = get_jack_status_error_string(status)
-            raise Exception(f"Error disconnecting: {error_msg}")
+            error_msg = get_jack_status_error_string(status) or f"JACK returned {result}"
+            raise JackConnectionError(f"Error disconnecting: {error_msg}", code=result)
 
     def connect(self):
         status = jacklib.jack_status_t()
@@ -79,15 +358,89 @@ class PortConnection:
 
         # Handling any errors if they arise
         if result != 0:
-            error_msg = get_jack_status_error_string(status)
-            raise Exception(f"Error connecting: {error_msg}")
+            error_msg = get_jack_status_error_string(status) or f"JACK returned {result}"
+            raise JackConnectionError(f"Error connecting: {error_msg}", code=result)
+
+
+class EdgeTable:
+    """
+    A dense table of connections, stored as two parallel arrays of port ids.
+
+    Holds tens of thousands of edges in a fraction of the memory of PortConnection objects;
+    those are only built on demand, from the PortRegistry the ids belong to.
+    """
+
+    __slots__ = ("registry", "client", "outputs", "inputs")
+
+    def __init__(self, registry: PortRegistry, client=None):
+        self.registry = registry
+        self.client = client
+        self.outputs = array("q")
+        self.inputs = array("q")
+
+    def __len__(self) -> int:
+        return len(self.outputs)
+
+    def add(self, output: Port, input: Port):
+        self.outputs.append(output.id)
+        self.inputs.append(input.id)
+
+    def pairs(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over ``(output id, input id)`` pairs."""
+        return zip(self.outputs, self.inputs)
+
+    def names(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over ``(output name, input name)`` pairs."""
+        by_id = self.registry.by_id
+        return ((by_id[o].name, by_id[i].name) for o, i in self.pairs())
+
+    def connection(self, index: int) -> PortConnection:
+        by_id = self.registry.by_id
+        return PortConnection(self.client, output=by_id[self.outputs[index]], input=by_id[self.inputs[index]])
+
+    def connections(self) -> List[PortConnection]:
+        """Materialize every edge as a PortConnection."""
+        by_id = self.registry.by_id
+        return [PortConnection(self.client, output=by_id[o], input=by_id[i]) for o, i in self.pairs()]
+
+
+class GraphSnapshot:
+    """
+    An immutable view of the JACK graph as tracked by a JackHandler.
+
+    ``version`` increases with every change the handler applies, so two snapshots with the same
+    version describe the same graph. ``edges`` holds ``(output name, input name)`` pairs.
+    """
+
+    def __init__(self, version: int, ports: List[Port], edges: FrozenSet[Tuple[str, str]]):
+        self.version = version
+        self.ports = ports
+        self.edges = edges
+        self.registry = PortRegistry(ports)
+
+    def __repr__(self) -> str:
+        return f"GraphSnapshot(version={self.version}, ports={len(self.ports)}, edges={len(self.edges)})"
 
 
 class JackHandler:
+    """
+    A JACK client for reading and changing the connection graph of one JACK server.
+
+    Args:
+        server_name: The name of the JACK server to connect to, as given to ``jackd -n``. The
+                     default server is used if not given.
+    """
 
-    def __init__(self):
+    def __init__(self, server_name: Optional[str] = None):
+        self.server_name = server_name
         status = jacklib.jack_status_t()
-        self.client = jacklib.client_open("PythonJackClient", jacklib.JackNoStartServer, status)
+        with profiling.phase("client_open"):
+            if server_name:
+                # jacklib passes its last argument on as the server name vararg of jack_client_open.
+                self.client = jacklib.client_open("PythonJackClient", jacklib.JackNoStartServer | jacklib.JackServerName,
+                                                  status, server_name)
+            else:
+                self.client = jacklib.client_open("PythonJackClient", jacklib.JackNoStartServer, status)
         err = get_jack_status_error_string(status)
 
         if status.value:
@@ -97,55 +450,376 @@ class JackHandler:
                 # Should not happen, since we use the JackNoStartServer option
                 print("Unexpected JACK status: %s" % err, file=sys.stderr)
             else:
-                raise Exception("Error connecting to JACK server: %s" % err)
+                raise Exception("Error connecting to JACK server%s: %s" % (f" '{server_name}'" if server_name else "", err))
 
         self.ports = None
+        self.registry = None
+        self.tracking = False
+        self.port_filter = (None, None, None)
 
     def get_jack_ports(self) -> List[Port]:
+        if self.tracking:
+            snapshot = self.get_snapshot()
+            self.ports, self.registry = snapshot.ports, snapshot.registry
+            return self.ports
         if self.ports is not None:
             return self.ports
 
-        port_names = c_char_p_p_to_list(jacklib.get_ports(self.client))
-        self.ports = []
-
-        for port_name in port_names:
-            port_ptr = jacklib.port_by_name(self.client, port_name)
-            uuid = jacklib.port_uuid(port_ptr)
-            client, port_short_name = port_name.split(":", 1)
-
-            port_type = jacklib.port_type(port_ptr)
-            port_flags = jacklib.port_flags(port_ptr)
-            direction = "input" if port_flags & jacklib.JackPortIsInput else "output"
-
-            aliases = jacklib.port_get_aliases(port_ptr)[1:]
-
-
-            in_range = jacklib.jack_latency_range_t()
-            out_range = jacklib.jack_latency_range_t()
+        with profiling.phase("enumerate_ports"):
+            port_names = self._get_port_names()
+            self.ports = [self._make_port(port_name) for port_name in port_names]
+            self.registry = PortRegistry(self.ports)
+        profiling.count("ports_enumerated", len(self.ports))
+        return self.ports
 
-            jacklib.port_get_latency_range(port_ptr, jacklib.JackCaptureLatency, in_range)
-            jacklib.port_get_latency_range(port_ptr, jacklib.JackPlaybackLatency, out_range)
+    def set_port_filter(self, name_pattern: Optional[str] = None, type_pattern: Optional[str] = None,
+                        direction: Optional[str] = None):
+        """
+        Limit port enumeration to matching ports, filtered by the JACK server itself.
+
+        ``name_pattern`` and ``type_pattern`` are POSIX extended regular expressions as understood by
+        ``jack_get_ports``; ``direction`` is "input" or "output". Connections to ports outside the
+        filter are not seen. The cached port snapshot is dropped.
+        """
+        if self.tracking:
+            raise RuntimeError("A port filter can't be combined with graph tracking")
+        self.port_filter = (name_pattern, type_pattern, direction)
+        self.ports = None
+        self.registry = None
+
+    def _get_port_names(self) -> List[str]:
+        name_pattern, type_pattern, direction = self.port_filter
+        flags = {None: 0, "input": jacklib.JackPortIsInput, "output": jacklib.JackPortIsOutput}[direction]
+        return c_char_p_p_to_list(jacklib.get_ports(self.client, name_pattern, type_pattern, flags))
+
+    def _make_port(self, port_name: str) -> Port:
+        """Query the JACK server for the attributes of one port needed to match and connect it."""
+        port_ptr = jacklib.port_by_name(self.client, port_name)
+        client, port_short_name = port_name.split(":", 1)
+
+        port_type = jacklib.port_type(port_ptr)
+        port_flags = jacklib.port_flags(port_ptr)
+        direction = "input" if port_flags & jacklib.JackPortIsInput else "output"
+
+        # UUID, aliases and latencies are only queried if someone asks for them.
+        return Port(port_ptr, port_name, client, self.client, port_short_name, port_type, LAZY, direction, LAZY, LAZY, LAZY, LAZY,
+                    flags=port_flags)
+
+    def refresh_ports(self) -> List[Port]:
+        """
+        Bring the cached port list up to date with the server.
+
+        Only the list of port names is fetched; ports that are still present keep their Port
+        instance and only newly registered ones are queried for their attributes. With graph
+        tracking enabled the tracked ports are returned, rescanning only if tracking was lost.
+        """
+        if self.tracking or self.ports is None:
+            return self.get_jack_ports()
+
+        with profiling.phase("refresh_ports"):
+            port_names = self._get_port_names()
+            known = self.get_port_registry().by_name
+            if len(port_names) == len(known) and all(name in known for name in port_names):
+                return self.ports
+
+            self.ports = [known.get(port_name) or self._make_port(port_name) for port_name in port_names]
+            self.registry = PortRegistry(self.ports)
+        profiling.count("ports_enumerated", sum(1 for name in port_names if name not in known))
+        return self.ports
 
-            in_latency = in_range.min  # or in_range.max based on the range specifics
-            out_latency = out_range.min  # or out_range.max based on the range specifics
+    def close(self):
+        """Close the JACK client. The handler can't be used afterwards."""
+        if self.client:
+            if self.tracking:
+                jacklib.deactivate(self.client)
+                self.tracking = False
+            jacklib.client_close(self.client)
+            self.client = None
+
+    # --- Graph tracking ---
+    #
+    # With tracking enabled, the handler keeps its ports and connections up to date from JACK's
+    # port registration, rename, client registration and port connect notifications instead of
+    # re-enumerating the graph. The callbacks run on JACK's notification thread: they look up
+    # what they need from the server first and then apply a small delta under ``_graph_lock``.
+    # Readers take immutable, versioned GraphSnapshots.
+
+    def enable_tracking(self):
+        """Register the JACK notification callbacks, activate the client and take the initial snapshot."""
+        if self.tracking:
+            return
+        if self.port_filter != (None, None, None):
+            raise RuntimeError("Graph tracking can't be combined with a port filter")
+        self._graph_lock = threading.Lock()
+        self._graph_ports: Dict[str, Port] = {}
+        self._graph_edges: Set[Tuple[str, str]] = set()
+        self._graph_port_edges: Dict[str, Set[Tuple[str, str]]] = {}
+        self._graph_version = 0
+        self._graph_dirty = False
+        self._snapshot = None
+        self._pending_deltas = None
+        self._graph_listeners = []
+
+        jacklib.set_port_registration_callback(self.client, self._on_port_registration, None)
+        jacklib.set_port_rename_callback(self.client, self._on_port_rename, None)
+        jacklib.set_client_registration_callback(self.client, self._on_client_registration, None)
+        jacklib.set_port_connect_callback(self.client, self._on_port_connect, None)
+        if jacklib.activate(self.client) != 0:
+            raise Exception("Error activating JACK client for graph tracking")
+
+        self.tracking = True
+        self._sync_graph()
+
+    def invalidate(self):
+        """Mark the tracked graph as unreliable, so the next snapshot is taken with a full rescan."""
+        if self.tracking:
+            with self._graph_lock:
+                self._graph_dirty = True
+
+    def note_connections(self, connected: Iterable[PortConnection] = (), disconnected: Iterable[PortConnection] = ()):
+        """
+        Record connection changes made through this handler right away.
+
+        JACK reports them asynchronously; recording them here means a snapshot taken right after
+        applying a plan already reflects it. The later notifications are no-ops.
+        """
+        if not self.tracking:
+            return
+        for connection in disconnected:
+            self._push_delta("disconnect", connection.output.name, connection.input.name)
+        for connection in connected:
+            self._push_delta("connect", connection.output.name, connection.input.name)
+
+    def record_report(self, report: Optional[ApplyReport]):
+        """
+        Record the changes an applied plan made through this handler, see ``note_connections``.
+
+        If some of them failed, the outcome on the server is uncertain and the tracked graph is
+        rescanned next time instead.
+        """
+        if report is None:
+            return
+        self.note_connections(connected=report.succeeded("connect"), disconnected=report.succeeded("disconnect"))
+        if not report.ok:
+            self.invalidate()
+
+    def get_snapshot(self) -> GraphSnapshot:
+        """Return a consistent snapshot of the tracked graph, rebuilt only if something changed."""
+        if not self.tracking:
+            raise RuntimeError("Graph tracking is not enabled, call enable_tracking() first")
+        if self._graph_dirty:
+            self._sync_graph()
+        with self._graph_lock:
+            if self._snapshot is None or self._snapshot.version != self._graph_version:
+                self._snapshot = GraphSnapshot(self._graph_version, list(self._graph_ports.values()),
+                                               frozenset(self._graph_edges))
+            return self._snapshot
+
+    def get_port_connections(self, port_names: Iterable[str]) -> List[PortConnection]:
+        """
+        Return the tracked connections of the given ports.
+
+        They are read from the per-port index of the tracked graph, so the cost depends on the
+        ports' own connections rather than on the size of the graph.
+        """
+        if not self.tracking:
+            raise RuntimeError("Graph tracking is not enabled, call enable_tracking() first")
+        if self._graph_dirty:
+            self._sync_graph()
+        with self._graph_lock:
+            edges = set()
+            for name in port_names:
+                edges.update(self._graph_port_edges.get(name, ()))
+            pairs = [(self._graph_ports.get(output_name), self._graph_ports.get(input_name))
+                     for output_name, input_name in edges]
+        return [PortConnection(self.client, output=source_port, input=dest_port) for source_port, dest_port in pairs
+                if source_port and dest_port and source_port.direction == "output" and dest_port.direction == "input"]
+
+    def _sync_graph(self):
+        """
+        Rescan all ports and connections, then replay the notifications that came in meanwhile.
+
+        Listeners are told about the difference to the graph before the rescan, so a port that
+        appeared while the graph was unreliable is still announced as added.
+        """
+        with self._graph_lock:
+            self._pending_deltas = []
+            self._graph_dirty = False
+            old_ports = self._graph_ports
+            old_edges = self._graph_edges
+
+        with profiling.phase("sync_graph"):
+            port_names = c_char_p_p_to_list(jacklib.get_ports(self.client))
+            ports = {}
+            for port_name in port_names:
+                port = self._query_port(port_name)
+                if port is not None:
+                    ports[port_name] = port
+            edges = set()
+            for port in ports.values():
+                if port.direction == "output":
+                    for dest_name in jacklib.port_get_all_connections(self.client, port.port_ptr):
+                        edges.add((port.name, dest_name))
+        profiling.count("ports_enumerated", len(ports))
+        profiling.count("edges_read", len(edges))
+
+        with self._graph_lock:
+            self._graph_ports = ports
+            self._graph_edges = set()
+            self._graph_port_edges = {}
+            for edge in edges:
+                if edge[1] in ports:
+                    self._add_edge(edge)
+            # Deltas are idempotent, so replaying ones already reflected by the rescan is harmless.
+            for delta in self._pending_deltas:
+                self._apply_delta(*delta)
+            self._pending_deltas = None
+            self._graph_version += 1
+            changes = [("remove_port", name) for name in old_ports.keys() - self._graph_ports.keys()]
+            changes.extend(("add_port", self._graph_ports[name])
+                           for name in self._graph_ports.keys() - old_ports.keys())
+            changes.extend(("disconnect", *edge) for edge in old_edges - self._graph_edges)
+            changes.extend(("connect", *edge) for edge in self._graph_edges - old_edges)
+
+        for delta in changes:
+            for listener in self._graph_listeners:
+                listener(*delta)
+
+    def _query_port(self, port_name: str) -> Optional[Port]:
+        """Like _make_port, but returns None if the port has vanished in the meantime."""
+        if not jacklib.port_by_name(self.client, port_name):
+            return None
+        return self._make_port(port_name)
+
+    def _port_name_by_id(self, port_id) -> Optional[str]:
+        port_ptr = jacklib.port_by_id(self.client, port_id)
+        return jacklib.port_name(port_ptr) if port_ptr else None
+
+    def add_graph_listener(self, listener: Callable[..., None]):
+        """
+        Call ``listener(kind, *args)`` for every change applied to the tracked graph.
+
+        ``kind`` is one of "add_port", "remove_port", "rename_port", "remove_client", "connect" and
+        "disconnect". Listeners run on JACK's notification thread, so they must return quickly and
+        must not change the graph themselves (e.g. by connecting ports).
+        """
+        self._graph_listeners.append(listener)
+
+    def _push_delta(self, *delta):
+        with self._graph_lock:
+            if self._pending_deltas is not None:
+                self._pending_deltas.append(delta)
+                return
+            self._apply_delta(*delta)
+            self._graph_version += 1
+        for listener in self._graph_listeners:
+            listener(*delta)
+
+    def _add_edge(self, edge: Tuple[str, str]):
+        self._graph_edges.add(edge)
+        for name in edge:
+            self._graph_port_edges.setdefault(name, set()).add(edge)
+
+    def _remove_edge(self, edge: Tuple[str, str]):
+        self._graph_edges.discard(edge)
+        for name in edge:
+            port_edges = self._graph_port_edges.get(name)
+            if port_edges is not None:
+                port_edges.discard(edge)
+
+    def _apply_delta(self, kind: str, *args):
+        """Apply one change to the tracked graph. Must be called with ``_graph_lock`` held."""
+        if kind == "add_port":
+            port, = args
+            self._graph_ports[port.name] = port
+        elif kind == "remove_port":
+            name, = args
+            self._graph_ports.pop(name, None)
+            for edge in self._graph_port_edges.pop(name, ()):
+                self._remove_edge(edge)
+        elif kind == "rename_port":
+            old_name, new_name = args
+            port = self._graph_ports.pop(old_name, None)
+            if port is not None:
+                self._graph_ports[new_name] = port.renamed(new_name)
+            for out, inp in self._graph_port_edges.pop(old_name, ()):
+                self._remove_edge((out, inp))
+                self._add_edge((new_name if out == old_name else out, new_name if inp == old_name else inp))
+        elif kind == "remove_client":
+            client, = args
+            gone = [name for name, port in self._graph_ports.items() if port.client == client]
+            for name in gone:
+                self._apply_delta("remove_port", name)
+        elif kind == "connect":
+            self._add_edge(args)
+        elif kind == "disconnect":
+            self._remove_edge(args)
+
+    def _on_port_registration(self, port_id, register, arg):
+        try:
+            port_name = self._port_name_by_id(port_id)
+            if port_name is None:
+                self._graph_dirty = True
+            elif register:
+                port = self._query_port(port_name)
+                if port is not None:
+                    self._push_delta("add_port", port)
+            else:
+                self._push_delta("remove_port", port_name)
+        except Exception:
+            self._graph_dirty = True
+
+    def _on_port_rename(self, port_id, old_name, new_name, arg):
+        try:
+            self._push_delta("rename_port", old_name.decode(), new_name.decode())
+        except Exception:
+            self._graph_dirty = True
+
+    def _on_client_registration(self, client_name, register, arg):
+        # New clients announce their ports individually; only removals need handling here.
+        if not register:
+            try:
+                self._push_delta("remove_client", client_name.decode())
+            except Exception:
+                self._graph_dirty = True
+
+    def _on_port_connect(self, port_a_id, port_b_id, connect, arg):
+        try:
+            port_a_ptr = jacklib.port_by_id(self.client, port_a_id)
+            port_b_ptr = jacklib.port_by_id(self.client, port_b_id)
+            if not port_a_ptr or not port_b_ptr:
+                self._graph_dirty = True
+                return
+            edge = (jacklib.port_name(port_a_ptr), jacklib.port_name(port_b_ptr))
+            if jacklib.port_flags(port_a_ptr) & jacklib.JackPortIsInput:
+                edge = edge[::-1]
+            self._push_delta("connect" if connect else "disconnect", *edge)
+        except Exception:
+            self._graph_dirty = True
+
+    def get_port_registry(self) -> PortRegistry:
+        """Return the index over the current port snapshot, building it on first use."""
+        ports = self.get_jack_ports()
+        if self.registry is None or self.registry.ports is not ports:
+            self.registry = PortRegistry(ports)
+        return self.registry
 
-            total_latency = jacklib.port_get_total_latency(self.client, port_ptr)
+    def get_port_by_name(self, port_name) -> Optional[Port]:
+        return self.get_port_registry().get(port_name)
 
-            port_instance = Port(port_ptr, port_name, client, self.client, port_short_name, port_type, uuid, direction, aliases, in_latency, out_latency, total_latency)
-            self.ports.append(port_instance)
+    def get_port_by_uuid(self, uuid) -> Optional[Port]:
+        return self.get_port_registry().get_by_uuid(uuid)
 
-        return self.ports
+    def get_port_by_alias(self, alias: str) -> Optional[Port]:
+        return self.get_port_registry().get_by_alias(alias)
 
-    def get_port_by_name(self, port_name):
-        for port in self.get_jack_ports():
-            if port.name == port_name:
-                return port
-        return None
+    def get_ports_by_direction(self, direction: str, port_type: Optional[str] = None) -> List[Port]:
+        """Return all ports with the given direction ("input"/"output"), optionally of one type only."""
+        return list(self.get_port_registry().get_by_direction(direction, port_type))
 
-    def get_ports_by_regex(self, port_regex):
-        """Get all ports matching a name regex."""
-        pattern = re.compile(port_regex)
-        return [port for port in self.get_jack_ports() if pattern.match(port.name)]
+    def get_ports_by_regex(self, port_regex, direction: Optional[str] = None) -> List[Port]:
+        """Get all ports matching a name regex, optionally only those with the given direction."""
+        return list(self.get_port_registry().match_regex(port_regex, direction))
 
 
     def _create_ports(self, properties_output: List[str], type_dict: Dict[str, str], uuid_dict: Dict[str, str],
@@ -175,17 +849,82 @@ class JackHandler:
 
         return ports
 
-    def get_jack_connections(self) -> List[PortConnection]:
-        """Fetch JACK connections using the jack_lsp command and return them as a list of PortConnection instances."""
-        # Retrieve all Port instances
-        ports = self.get_jack_ports()
-        port_map = {port.name: port for port in ports}  # Create a dict for easy lookup
+    def get_jack_connections(self, backend: Literal["jacklib", "jack_lsp"] = "jacklib") -> List[PortConnection]:
+        """Fetch JACK connections and return them as a list of PortConnection instances.
+
+        The default ``jacklib`` backend walks the connection graph in-process through the already
+        open client, so it sees the same snapshot as ``get_jack_ports``. The ``jack_lsp`` backend
+        parses the output of ``jack_lsp -c`` and is kept as a fallback.
+        """
+        if backend == "jacklib":
+            return self.get_edge_table().connections()
+        elif backend == "jack_lsp":
+            return self._get_jack_connections_lsp()
+        raise ValueError(f"Unknown connections backend: {backend}")
+
+    def get_edge_table(self, backend: Literal["jacklib", "jack_lsp"] = "jacklib") -> EdgeTable:
+        """Like ``get_jack_connections``, but returns the connections as a compact EdgeTable."""
+        if backend == "jacklib":
+            if self.tracking:
+                return self._get_edge_table_tracked()
+            return self._get_edge_table_native()
+        elif backend == "jack_lsp":
+            table = EdgeTable(self.get_port_registry(), self.client)
+            for connection in self._get_jack_connections_lsp():
+                table.add(connection.output, connection.input)
+            return table
+        raise ValueError(f"Unknown connections backend: {backend}")
+
+    def _get_edge_table_native(self) -> EdgeTable:
+        """Build the connection table by querying each output port's connections via jacklib."""
+        registry = self.get_port_registry()
+        port_map = registry.by_name
+
+        table = EdgeTable(registry, self.client)
+        with profiling.phase("read_connections"):
+            for source_port in registry.ports:
+                # Every edge has exactly one output end, so walking outputs visits each edge once.
+                if source_port.direction != "output":
+                    continue
+                for dest_name in jacklib.port_get_all_connections(self.client, source_port.port_ptr):
+                    dest_port = port_map.get(dest_name)
+                    # Ports registered after the snapshot was taken are not known yet; skip them.
+                    if dest_port and dest_port.direction == "input":
+                        table.add(source_port, dest_port)
+
+        profiling.count("edges_read", len(table))
+        return table
+
+    def _get_edge_table_tracked(self) -> EdgeTable:
+        """Build the connection table from the tracked graph, without asking the server."""
+        snapshot = self.get_snapshot()
+        port_map = snapshot.registry.by_name
+        table = EdgeTable(snapshot.registry, self.client)
+        with profiling.phase("read_connections"):
+            for output_name, input_name in snapshot.edges:
+                source_port, dest_port = port_map.get(output_name), port_map.get(input_name)
+                if source_port and dest_port and source_port.direction == "output" and dest_port.direction == "input":
+                    table.add(source_port, dest_port)
+        profiling.count("edges_read", len(table))
+        return table
+
+    def _get_jack_connections_lsp(self) -> List[PortConnection]:
+        """Fetch JACK connections using the jack_lsp command."""
+        port_map = self.get_port_registry().by_name
 
         # Read the connections
-        output = subprocess.check_output(["jack_lsp", "-c"], text=True).strip().split("\n")
+        with profiling.phase("jack_lsp"):
+            output = subprocess.check_output(["jack_lsp", "-c"], text=True).strip().split("\n")
+        with profiling.phase("parse_jack_lsp"):
+            connections = self._parse_jack_lsp_connections(output, port_map)
+        profiling.count("edges_read", len(connections))
+        return connections
 
+    def _parse_jack_lsp_connections(self, output: List[str], port_map: Dict[str, Port]) -> List[PortConnection]:
+        """Turn the indented ``jack_lsp -c`` output lines into PortConnection instances."""
         # Create PortConnection instances
         connections = []
+        seen = set()
         i = 0
         while i < len(output):
             source_name = output[i].strip()
@@ -206,7 +945,8 @@ class JackHandler:
                 if source_port and dest_port and source_port.direction == "output" and dest_port.direction == "input":
                     connection = PortConnection(self.client, output=source_port, input=dest_port)
                     # Ensure we're not adding duplicate connections
-                    if connection not in connections:
+                    if connection not in seen:
+                        seen.add(connection)
                         connections.append(connection)
                 i += 1
 
@@ -214,190 +954,617 @@ class JackHandler:
 
     def get_client_names(self):
         """Get a sorted list of unique client names from the ports."""
-        # Fetch all ports
-        ports = self.get_jack_ports()
-
-        # Extract the client names from the ports
-        client_names = set(port.client for port in ports)
-
-        return sorted(client_names)
+        return list(self.get_port_registry().client_names)
 
     def get_ports_by_client_name(self, client_name: str) -> List[Port]:
         """Return a list of Port objects associated with the given client name."""
-        ports = self.get_jack_ports()
-        return [port for port in ports if port.client == client_name]
+        return list(self.get_port_registry().get_by_client(client_name))
+
 
+class PortMatcher:
+    """
+    Resolves the port specs of a config against a JackHandler.
 
-def load(config_path, regex_matching=False, disconnect=False):
+    Each distinct spec is resolved once per matcher, so an input regex shared by many outputs is
+    not re-evaluated for every output it gets connected to.
+    """
+
+    def __init__(self, jh: 'JackHandler', regex_matching: bool = False):
+        self.jh = jh
+        self.regex_matching = regex_matching
+        self._resolved: Dict[Tuple[str, str], List[Port]] = {}
+
+    def resolve(self, port_spec: str, direction: str) -> List[Port]:
+        """Return the ports for an exact ``client:port`` name or a ``regex:``, ``alias:`` or ``uuid:`` spec."""
+        key = (port_spec, direction)
+        ports = self._resolved.get(key)
+        if ports is None:
+            kind, value = _parse_port_spec(port_spec)
+            if kind == "regex":
+                if not self.regex_matching:
+                    raise RuntimeError(f"Port spec {port_spec} requires regex matching to be enabled (-r flag)")
+                ports = self.jh.get_ports_by_regex(value, direction=direction)
+            elif kind == "name":
+                port = self.jh.get_port_by_name(port_spec)
+                ports = [port] if port else []
+            else:
+                port = self.jh.get_port_by_alias(value) if kind == "alias" else self.jh.get_port_by_uuid(value)
+                # Unlike names, aliases and UUIDs don't tell which side of a connection a port is on.
+                ports = [port] if port and port.direction == direction else []
+            self._resolved[key] = ports
+        return ports
+
+
+def _sorted_connections(connections: Iterable['PortConnection']) -> List['PortConnection']:
+    return sorted(connections, key=lambda c: (c.output.name, c.input.name))
+
+
+class ConnectionPlan:
+    """
+    The changes needed to bring the live JACK graph in line with a config.
+
+    All members are sets of PortConnection, which compare by their (output, input) port names:
+    ``to_connect`` and ``to_disconnect`` are the edges to change, ``unchanged`` the wanted edges that
+    already exist and ``not_found`` the edges the config asks to disconnect but which don't exist.
+    """
+
+    def __init__(self, to_connect: Set['PortConnection'], to_disconnect: Set['PortConnection'],
+                 unchanged: Set['PortConnection'], not_found: Set['PortConnection']):
+        self.to_connect = to_connect
+        self.to_disconnect = to_disconnect
+        self.unchanged = unchanged
+        self.not_found = not_found
+        self.report: Optional[ApplyReport] = None
+
+    def __repr__(self) -> str:
+        return (f"ConnectionPlan(connect={len(self.to_connect)}, disconnect={len(self.to_disconnect)}, "
+                f"unchanged={len(self.unchanged)}, not_found={len(self.not_found)})")
+
+    def is_empty(self) -> bool:
+        return not self.to_connect and not self.to_disconnect
+
+    def summary(self) -> Dict[str, int]:
+        """Return the number of connections in each category, plus failed changes once applied."""
+        summary = {"connect": len(self.to_connect), "disconnect": len(self.to_disconnect),
+                   "unchanged": len(self.unchanged), "not_found": len(self.not_found)}
+        if self.report is not None:
+            summary["failed"] = len(self.report.failures)
+        return summary
+
+    def transaction_steps(self) -> List[Tuple[str, List['PortConnection']]]:
+        """
+        Order the changes so that signal keeps flowing: make new connections before breaking old ones.
+
+        An input that is both gaining and losing a source would briefly receive the sum of both.
+        That is harmless inside the graph, but not at a physical or terminal input, where signal
+        leaves it, e.g. for the speakers. Those connections are only made after the disconnections.
+        """
+        losing = {connection.input.name for connection in self.to_disconnect}
+        make, swap = [], []
+        for connection in _sorted_connections(self.to_connect):
+            unsafe = connection.input.name in losing and connection.input.is_endpoint
+            (swap if unsafe else make).append(connection)
+        return [("connect", make), ("disconnect", _sorted_connections(self.to_disconnect)), ("connect", swap)]
+
+    def execute(self, executor: Optional[ConnectionExecutor] = None, transactional: bool = False,
+                log: Optional[Callable[[str], None]] = print) -> ApplyReport:
+        """
+        Apply the plan, disconnections first, then connections, and pass what was done to ``log``.
+
+        Failed operations don't stop the run; they are listed in the returned report, which is
+        also kept as ``self.report``. If ``transactional``, the plan is applied in the order of
+        ``transaction_steps`` instead, and the first failure rolls back all changes made so far,
+        see ``ConnectionExecutor.run_transaction``. ``log`` may be None to stay silent.
+        """
+        executor = executor or ConnectionExecutor()
+        lines = [f"Connection not found, cannot disconnect: {connection.output.name} to {connection.input.name}"
+                 for connection in _sorted_connections(self.not_found)]
+        if transactional:
+            self.report = executor.run_transaction(self.transaction_steps())
+            lines.extend(f"Connection already established: {connection.output.name} to {connection.input.name}"
+                         for connection in _sorted_connections(self.unchanged))
+            lines.extend(self.report.log)
+            if self.report.rolled_back:
+                lines.append("Rolled back all changes" if self.report.rollback_ok else
+                             "Rollback failed, the graph is partly changed")
+            lines.append(f"Mutation window: {self.report.mutation_window * 1000:.1f} ms")
+            if log is not None:
+                log("\n".join(lines))
+            return self.report
+
+        self.report = executor.run(disconnects=_sorted_connections(self.to_disconnect),
+                                   connects=_sorted_connections(self.to_connect))
+        log_lines = iter(self.report.log)
+        lines.extend(next(log_lines) for result in self.report.results if result.action == "disconnect")
+        lines.extend(f"Connection already established: {connection.output.name} to {connection.input.name}"
+                     for connection in _sorted_connections(self.unchanged))
+        lines.extend(log_lines)
+        if lines and log is not None:
+            log("\n".join(lines))
+        return self.report
+
+
+def plan_connections(existing: Iterable['PortConnection'], wanted: Iterable['PortConnection'],
+                     unwanted: Iterable['PortConnection'] = (), disconnect_others: bool = False) -> ConnectionPlan:
+    """
+    Diff the live graph against the target edges of a config.
+
+    Args:
+        existing: The connections currently present in the JACK graph.
+        wanted: The connections the config asks for.
+        unwanted: The connections the config explicitly asks to remove (``disconnect:`` rules).
+        disconnect_others: If True, every existing connection that is not wanted is removed as well.
+    """
+    existing = set(existing)
+    wanted = set(wanted)
+    unwanted = set(unwanted)
+
+    to_disconnect = unwanted & existing
+    if disconnect_others:
+        to_disconnect |= existing - wanted
+    remaining = existing - to_disconnect
+
+    return ConnectionPlan(to_connect=wanted - remaining, to_disconnect=to_disconnect,
+                          unchanged=wanted & remaining, not_found=unwanted - existing)
+
+
+class Rule:
+    """
+    One ``output = [inputs]`` entry of a connection config.
+
+    ``output_spec`` is the full spec of the output side (``client:port`` or ``client:regex:...``),
+    ``output_key`` the key as written in the config, without a ``disconnect:`` prefix. ``server`` is
+    the JACK server a ``["server:<name>".<client>]`` section restricts the rule to, or None.
+    """
+
+    def __init__(self, client: str, output_key: str, inputs: List[str], is_disconnect: bool = False,
+                 server: Optional[str] = None):
+        self.client = client
+        self.output_key = output_key
+        self.output_spec = f"{client}:{output_key}"
+        self.inputs = inputs
+        self.is_disconnect = is_disconnect
+        self.server = server
+
+    def __repr__(self) -> str:
+        return f"Rule(output_spec='{self.output_spec}', inputs={self.inputs}, is_disconnect={self.is_disconnect})"
+
+    def uses_regex(self) -> bool:
+        return any(_parse_port_spec(spec)[0] == "regex" for spec in [self.output_spec, *self.inputs])
+
+    def applies_to(self, server_name: Optional[str] = None) -> bool:
+        """Whether the rule is meant for the given JACK server; None is the default server."""
+        return self.server is None or self.server == (server_name or "default")
+
+
+def compile_rules(config: Dict, regex_matching: bool = False) -> List[Rule]:
+    """
+    Normalize a parsed connection config, which is structured by client, then by output port, into rules.
+
+    Tables named ``server:<name>`` hold clients like the top level does, but their rules only
+    apply to that JACK server. Client names can't contain ":", so the two can't be confused.
+    """
+    rules = []
+    sections = [(None, config)]
+    while sections:
+        server, clients = sections.pop(0)
+        for client, port_map in clients.items():
+            if server is None and client.startswith("server:"):
+                sections.append((client[len("server:"):], port_map))
+                continue
+            for output_key, inputs in port_map.items():
+                # Check if the operation is a disconnection (prefixed with "disconnect:").
+                is_disconnect = output_key.startswith("disconnect:")
+                if is_disconnect:
+                    output_key = output_key[len("disconnect:"):]
+                rules.append(Rule(client, output_key, list(inputs), is_disconnect, server))
+
+    if not regex_matching:
+        _check_no_regex(rules)
+    return rules
+
+
+def _check_no_regex(rules: Iterable[Rule]):
+    for rule in rules:
+        if _parse_port_spec(rule.output_spec)[0] == "regex":
+            raise RuntimeError(f"Port spec {rule.output_key} requires regex matching to be enabled (-r flag)")
+
+
+# Bump whenever the layout of the cached rule table changes.
+_RULE_CACHE_VERSION = 2
+
+
+def rule_cache_path(config_path) -> str:
+    """Return where the compiled rule table of ``config_path`` is cached: a hidden file next to it."""
+    directory, name = os.path.split(os.path.abspath(config_path))
+    return os.path.join(directory, f".{name}.jackmesh-cache")
+
+
+def load_rules(config_path, regex_matching: bool = False, use_cache: bool = True) -> List[Rule]:
+    """
+    Parse a TOML connection config into rules, reusing the cached rule table if the file is unchanged.
+
+    The cache stores the rule table (client, output key, inputs, disconnect flag, server per rule) with
+    ``marshal``, keyed by the config's mtime and size. If those differ, the contents are hashed, so
+    a file that was rewritten with the same contents is still a hit. Unreadable or outdated caches
+    are ignored and rewritten; if the directory is not writable, the config is simply parsed.
+    """
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        use_cache = False
+    if not use_cache:
+        return compile_rules(toml.load(config_path), regex_matching=regex_matching)
+
+    cache_path = rule_cache_path(config_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _read_rule_cache(cache_path)
+
+    digest = None
+    if cached is None or cached[1] != key:
+        with open(config_path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).digest()
+    if cached is not None and (cached[1] == key or cached[2] == digest):
+        profiling.count("config_cache_hits")
+        rows = cached[3]
+        rules = [Rule(client, output_key, list(inputs), is_disconnect, server)
+                 for client, output_key, inputs, is_disconnect, server in rows]
+        if cached[1] != key:
+            _write_rule_cache(cache_path, key, digest, rows)
+    else:
+        profiling.count("config_cache_misses")
+        rules = compile_rules(toml.loads(data.decode("utf-8")), regex_matching=True)
+        rows = [(rule.client, rule.output_key, tuple(rule.inputs), rule.is_disconnect, rule.server) for rule in rules]
+        _write_rule_cache(cache_path, key, digest, rows)
+
+    if not regex_matching:
+        _check_no_regex(rules)
+    return rules
+
+
+def _read_rule_cache(cache_path: str) -> Optional[tuple]:
+    try:
+        with open(cache_path, "rb") as f:
+            cached = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, tuple) or len(cached) != 4 or cached[0] != _RULE_CACHE_VERSION:
+        return None
+    return cached
+
+
+def _write_rule_cache(cache_path: str, key: tuple, digest: bytes, rows: List[tuple]):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            marshal.dump((_RULE_CACHE_VERSION, key, digest, rows), f)
+        # Concurrent loads may race here; os.replace makes sure readers never see a partial file.
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+
+
+# Characters that have to be escaped in a POSIX extended regex, as used by jack_get_ports.
+_POSIX_ERE_META = frozenset(".[]()*+?{}|^$\\")
+
+
+def rules_port_filter(rules: Iterable[Rule]) -> Optional[str]:
+    """
+    Return a ``jack_get_ports`` name pattern covering every port the rules can refer to.
+
+    The pattern selects whole clients. Returns None if some spec does not start with a literal
+    client name, or refers to a port by alias or UUID, in which case all ports have to be enumerated.
+    """
+    clients = set()
+    for rule in rules:
+        for port_spec in [rule.output_spec, *rule.inputs]:
+            kind, value = _parse_port_spec(port_spec)
+            if kind in ("alias", "uuid"):
+                return None
+            literal = _regex_literal_prefix(value) if kind == "regex" else value
+            if ":" not in literal:
+                return None
+            clients.add(literal.split(":", 1)[0])
+    if not clients:
+        return None
+    escaped = ("".join("\\" + ch if ch in _POSIX_ERE_META else ch for ch in client) for client in sorted(clients))
+    return "^(" + "|".join(escaped) + "):"
+
+
+def resolve_rules(jh: 'JackHandler', rules: Iterable[Rule], regex_matching: bool = False,
+                  warn: Callable[[str], None] = print) -> Tuple[Set[PortConnection], Set[PortConnection]]:
+    """
+    Resolve connection rules against the ports known to ``jh``.
+
+    Specs that match no port are reported through ``warn``, which prints them by default.
+
+    Returns:
+        A ``(wanted, unwanted)`` pair of PortConnection sets, the latter coming from ``disconnect:`` rules.
+    """
+    # Port specs are resolved once per run, however many rules refer to them.
+    matcher = PortMatcher(jh, regex_matching=regex_matching)
+
+    wanted = set()
+    unwanted = set()
+
+    for rule in rules:
+        # Resolve the output port(s) from the configuration key.
+        output_ports = matcher.resolve(rule.output_spec, "output")
+
+        # If no matching output ports are found, print a warning and skip.
+        if not output_ports:
+            warn(f"Could not find any port for: {rule.output_key}")
+            continue
+
+        # For each resolved output port, resolve the corresponding input port(s).
+        target = unwanted if rule.is_disconnect else wanted
+        for output_port in output_ports:
+            for inp in rule.inputs:
+                input_ports = matcher.resolve(inp, "input")
+
+                # If no matching input ports are found, print a warning and skip.
+                if not input_ports:
+                    warn(f"Could not find any port for: {inp}")
+                    continue
+
+                # Create PortConnection objects for each valid output-input pair.
+                for input_port in input_ports:
+                    target.add(PortConnection(output_port.client_ptr, output=output_port, input=input_port))
+
+    return wanted, unwanted
+
+
+class PlanCache:
+    """
+    LRU cache of resolved configs, i.e. the ``(wanted, unwanted)`` connection sets of ``resolve_rules``.
+
+    Entries are keyed by the config file (path, modification time, size), the regex mode and the
+    fingerprint of the port registry they were resolved against, so switching back to a scene on
+    an unchanged graph skips parsing and resolving altogether. At most ``max_entries`` plans and
+    ``max_edges`` connections in total are kept; the least recently used plans are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 16, max_edges: int = 100_000):
+        self.max_entries = max_entries
+        self.max_edges = max_edges
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[tuple, Tuple[FrozenSet[PortConnection], FrozenSet[PortConnection]]] = OrderedDict()
+        self._edges = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(config_path, regex_matching: bool, registry: PortRegistry) -> Optional[tuple]:
+        """Return the cache key for resolving ``config_path`` against ``registry``, or None if the file can't be read."""
+        try:
+            stat = os.stat(config_path)
+        except OSError:
+            return None
+        return os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size, bool(regex_matching), registry.fingerprint
+
+    def get(self, key: tuple) -> Optional[Tuple[FrozenSet[PortConnection], FrozenSet[PortConnection]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            profiling.count("plan_cache_misses")
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        profiling.count("plan_cache_hits")
+        return entry
+
+    def put(self, key: tuple, wanted: Iterable[PortConnection], unwanted: Iterable[PortConnection]):
+        entry = (frozenset(wanted), frozenset(unwanted))
+        size = len(entry[0]) + len(entry[1])
+        if size > self.max_edges:
+            return
+        self._discard(key)
+        self._entries[key] = entry
+        self._edges += size
+        while len(self._entries) > self.max_entries or self._edges > self.max_edges:
+            self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self._edges = 0
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._edges -= len(entry[0]) + len(entry[1])
+
+
+def load(config_path, regex_matching=False, disconnect=False, connections_backend="jacklib", dry_run=False,
+         jh: Optional[JackHandler] = None, executor: Optional[ConnectionExecutor] = None,
+         use_cache=True, plan_cache: Optional[PlanCache] = None, server_name: Optional[str] = None,
+         transactional=False, warn: Callable[[str], None] = print, log: Optional[Callable[[str], None]] = print,
+         on_plan: Optional[Callable[[ConnectionPlan], None]] = None,
+         on_result: Optional[Callable[[EdgeResult], None]] = None,
+         cancel: Optional[threading.Event] = None) -> ConnectionPlan:
     """
     Loads JACK connections from a TOML configuration file.
 
     This function reads a specified TOML file to determine which JACK ports to connect or disconnect.
     It can handle both explicit port names and regular expressions for more flexible configurations.
-    It also has an option to disconnect all existing connections before applying the new ones.
+    It also has an option to remove every existing connection that the config does not ask for.
 
     Args:
         config_path (str): The path to the TOML configuration file.
         regex_matching (bool, optional): If True, allows the use of regular expressions for port names
                                          in the config file. Defaults to False.
-        disconnect (bool, optional): If True, all existing JACK connections will be disconnected before
-                                     the new connections from the config file are made. Defaults to False.
+        disconnect (bool, optional): If True, existing JACK connections that are not part of the config
+                                     are disconnected. Connections the config asks for are left
+                                     untouched. Defaults to False.
+        connections_backend (str, optional): How to read the live connection graph, either "jacklib"
+                                             (in-process) or "jack_lsp" (subprocess fallback).
+                                             Defaults to "jacklib".
+        dry_run (bool, optional): If True, the planned changes are printed but not applied. Defaults to False.
+        jh (JackHandler, optional): The handler to use. A new one is opened, and closed afterwards,
+                                    if not given.
+        executor (ConnectionExecutor, optional): How to apply the changes. Defaults to applying them
+                                                 sequentially.
+        use_cache (bool, optional): If True, the compiled rule table is cached next to the config and
+                                    reused while the config is unchanged, see ``load_rules``.
+                                    Defaults to True.
+        plan_cache (PlanCache, optional): If given, the resolved connections are looked up in and
+                                          stored into this cache. Only useful with a long-lived ``jh``;
+                                          on a hit, warnings about unmatched specs are not repeated.
+        server_name (str, optional): The JACK server to connect to if no ``jh`` is given. Only the
+                                     config's rules for this server, and those for every server,
+                                     are applied. Defaults to the default server.
+        transactional (bool, optional): If True, the changes are applied all or nothing, making new
+                                        connections before breaking old ones. On a failure, the graph
+                                        is rolled back to the connections read before applying.
+                                        Defaults to False.
+        warn (callable, optional): Called with a message for every spec that matches no port.
+                                   Defaults to print.
+        log (callable, optional): Called with the lines describing what was (or, for a dry run,
+                                  would be) changed. None stays silent. Defaults to print.
+        on_plan (callable, optional): Called with the plan before it is applied.
+        on_result (callable, optional): Installed on the executor, see ``ConnectionExecutor``.
+        cancel (threading.Event, optional): Installed on the executor. If it is set by the time
+                                            the plan is made, the plan is returned without
+                                            being applied.
+
+    Returns:
+        ConnectionPlan: The set of changes computed for (and, unless ``dry_run``, applied to) the graph.
+                        After applying, ``plan.report`` holds the per-edge results.
     """
-    # Initialize the JackHandler to interact with the JACK server.
-    jh = JackHandler()
-    # Load the connection configuration from the specified TOML file.
-    config = toml.load(config_path)
-    # Retrieve a list of all currently active JACK connections.
-    existing_connections = jh.get_jack_connections()
-
-    # If the 'disconnect' flag is set, disconnect all existing connections.
-    # This is useful for ensuring a clean state before applying a new configuration.
-    if disconnect:
-        def disconnect_all_and_print(connection):
-            connection.disconnect()
-            print(f"Disconnected {connection.output.name} from {connection.input.name}")
-
-        with ThreadPoolExecutor() as executor:
-            list(executor.map(disconnect_all_and_print, existing_connections))
-        # After disconnecting, the list of existing connections is cleared.
-        existing_connections = []
-
-    # Prepare lists to hold the connection and disconnection operations defined in the config.
-    connections_to_make = []
-    disconnections_to_make = []
-
-    # Iterate over the configuration file, which is structured by client, then by output port.
-    for client, port_map in config.items():
-        for output_key, inputs in port_map.items():
-            # Check if the operation is a disconnection (prefixed with "disconnect:").
-            is_disconnect = output_key.startswith("disconnect:")
-            if is_disconnect:
-                output_key = output_key[len("disconnect:"):]
-
-            # Resolve the output port(s) from the configuration key.
-            output_ports = []
-            if "regex:" in output_key:
-                if regex_matching:
-                    # If regex is enabled, construct the regex pattern and find matching ports.
-                    output_port_name_re = f"{client}:{output_key.replace('regex:', '')}"
-                    output_ports.extend(jh.get_ports_by_regex(output_port_name_re))
-                else:
-                    raise RuntimeError(f"Port spec {output_key} requires regex matching to be enabled (-r flag)")
-            else:
-                # For non-regex, find the port by its exact name.
-                output_port_name = f"{client}:{output_key}"
-                output_port = jh.get_port_by_name(output_port_name)
-                if output_port:
-                    output_ports.append(output_port)
-
-            # If no matching output ports are found, print a warning and skip.
-            if not output_ports:
-                print(f"Could not find any port for: {output_key}")
-                continue
-
-            # For each resolved output port, resolve the corresponding input port(s).
-            for output_port in output_ports:
-                for inp in inputs:
-                    input_ports = []
-                    if "regex:" in inp:
-                        if regex_matching:
-                            # Handle regex for input ports.
-                            input_ports.extend(jh.get_ports_by_regex(inp.replace('regex:', '')))
-                        else:
-                            raise RuntimeError(f"Port spec {inp} requires regex matching to be enabled (-r flag)")
-                    else:
-                        # Handle exact names for input ports.
-                        input_port = jh.get_port_by_name(inp)
-                        if input_port:
-                            input_ports.append(input_port)
-
-                    # If no matching input ports are found, print a warning and skip.
-                    if not input_ports:
-                        print(f"Could not find any port for: {inp}")
-                        continue
-
-                    # Create PortConnection objects for each valid output-input pair.
-                    for input_port in input_ports:
-                        connection = PortConnection(output_port.client_ptr, output=output_port, input=input_port)
-                        if is_disconnect:
-                            disconnections_to_make.append(connection)
-                        else:
-                            connections_to_make.append(connection)
-
-    # --- Execute Disconnections ---
-    # A helper function to print and perform disconnection.
-    def disconnect_and_print(connection):
-        print(f"Disconnecting {connection.output.name} from {connection.input.name}...")
-        connection.disconnect()
-
-    # Filter the list of disconnections to only include those that actually exist.
-    actual_disconnections = []
-    for connection in disconnections_to_make:
-        if connection in existing_connections:
-            actual_disconnections.append(connection)
-        else:
-            print(f"Connection not found, cannot disconnect: {connection.output.name} to {connection.input.name}")
-
-    # Perform the disconnections in parallel for efficiency.
-    if actual_disconnections:
-        with ThreadPoolExecutor() as executor:
-            list(executor.map(disconnect_and_print, actual_disconnections))
-
-        # Update the list of existing connections by removing the ones that were disconnected.
-        existing_connections_set = set(existing_connections)
-        actual_disconnections_set = set(actual_disconnections)
-        existing_connections = list(existing_connections_set - actual_disconnections_set)
-
-    # --- Execute Connections ---
-    # A helper function to print and perform connection.
-    def connect_and_print(connection):
-        print(f"Connecting {connection.output.name} to {connection.input.name}...")
-        connection.connect()
-
-    # Filter the list of connections to only include those that don't already exist.
-    actual_connections = []
-    for connection in connections_to_make:
-        if connection not in existing_connections:
-            actual_connections.append(connection)
-        else:
-            print(f"Connection already established: {connection.output.name} to {connection.input.name}")
-
-    # Perform the new connections in parallel.
-    if actual_connections:
-        with ThreadPoolExecutor() as executor:
-            list(executor.map(connect_and_print, actual_connections))
+    if jh is not None:
+        server_name = jh.server_name
 
-def dump():
-    jh = JackHandler()
+    def parse_config():
+        with profiling.phase("parse_config"):
+            rules = [rule for rule in load_rules(config_path, regex_matching=regex_matching, use_cache=use_cache)
+                     if rule.applies_to(server_name)]
+        profiling.count("rules", len(rules))
+        return rules
 
-    # Get all connections
-    connections = jh.get_jack_connections()
+    # Load the connection configuration from the specified TOML file. With a plan cache and a
+    # long-lived handler, that can wait until we know the resolved plan isn't cached.
+    rules = None if plan_cache is not None and jh is not None else parse_config()
 
-    # Build a mapping from source port to list of destination ports
-    connections_map = {}
-    for connection in connections:
-        if connection.output.name not in connections_map:
-            connections_map[connection.output.name] = []
-        connections_map[connection.output.name].append(connection.input.name)
+    # Initialize the JackHandler to interact with the JACK server.
+    own_handler = jh is None
+    if own_handler:
+        jh = JackHandler(server_name)
+        # Unless every other connection has to be found and removed, only the clients the
+        # config refers to need to be enumerated.
+        if not disconnect:
+            name_pattern = rules_port_filter(rules)
+            if name_pattern is not None:
+                jh.set_port_filter(name_pattern=name_pattern)
+
+    try:
+        # Retrieve all currently active JACK connections.
+        existing_connections = jh.get_jack_connections(backend=connections_backend)
+
+        cache_key = PlanCache.key(config_path, regex_matching, jh.get_port_registry()) if plan_cache is not None else None
+        resolved = plan_cache.get(cache_key) if cache_key is not None else None
+        if resolved is None:
+            if rules is None:
+                rules = parse_config()
+            with profiling.phase("resolve"):
+                resolved = resolve_rules(jh, rules, regex_matching=regex_matching, warn=warn)
+            if cache_key is not None:
+                plan_cache.put(cache_key, *resolved)
+        wanted, unwanted = resolved
+        profiling.count("edges_resolved", len(wanted) + len(unwanted))
+        with profiling.phase("plan"):
+            plan = plan_connections(existing_connections, wanted, unwanted, disconnect_others=disconnect)
+
+        if on_plan is not None:
+            on_plan(plan)
+
+        if dry_run:
+            if log is not None:
+                for connection in _sorted_connections(plan.to_disconnect):
+                    log(f"Would disconnect {connection.output.name} from {connection.input.name}")
+                for connection in _sorted_connections(plan.to_connect):
+                    log(f"Would connect {connection.output.name} to {connection.input.name}")
+        elif cancel is None or not cancel.is_set():
+            executor = executor or ConnectionExecutor()
+            if on_result is not None:
+                executor.on_result = on_result
+            if cancel is not None:
+                executor.cancel = cancel
+            plan.execute(executor, transactional=transactional, log=log)
+            jh.record_report(plan.report)
+        return plan
+    finally:
+        if own_handler:
+            jh.close()
+
+def config_edges(config_path) -> Set[Tuple[str, str]]:
+    """Return the ``(output name, input name)`` pairs a config, such as an earlier dump, connects."""
+    return {(rule.output_spec, inp) for rule in load_rules(config_path, regex_matching=True, use_cache=False)
+            if not rule.is_disconnect and not rule.uses_regex() for inp in rule.inputs}
+
+
+def iter_dump(jh: 'JackHandler', connections_backend="jacklib",
+              since: Optional[Iterable[Tuple[str, str]]] = None) -> Iterator[str]:
+    """
+    Yield the current connections of ``jh`` as TOML, one table per client.
 
-    # Get a list of all unique client names
-    clients = jh.get_client_names()
+    Clients, output ports and their inputs are sorted, so dumps of the same graph are identical
+    and dumps of different graphs diff cleanly. Only one client's table is formatted at a time.
 
-    # Create a dictionary in the required format
-    formatted_connections = {}
-    for client in clients:
-        ports = jh.get_ports_by_client_name(client)
-        for port in ports:
-            source = port.name
-            if source in connections_map:
-                _, port_name = source.split(":", 1)
-                if client not in formatted_connections:
-                    formatted_connections[client] = {}
-                formatted_connections[client][port_name] = connections_map[source]
+    Args:
+        since: The edges of an earlier dump, see ``config_edges``. If given, only the differences are
+               written: new connections as usual and removed ones as ``disconnect:`` entries, so
+               loading the output turns the earlier graph into the current one.
+    """
+    edges = jh.get_edge_table(backend=connections_backend).names()
+    if since is None:
+        entries = [(output_name, "", input_name) for output_name, input_name in edges]
+    else:
+        current, previous = set(edges), set(since)
+        entries = [(output_name, "", input_name) for output_name, input_name in current - previous]
+        entries.extend((output_name, "disconnect:", input_name) for output_name, input_name in previous - current)
+    entries.sort()
+    profiling.count("edges_dumped", len(entries))
+
+    # A client's ports are contiguous in the sorted entries, since client names can't contain ":".
+    first = True
+    for client, client_entries in itertools.groupby(entries, key=lambda entry: entry[0].split(":", 1)[0]):
+        table = {}
+        for (output_name, prefix), port_entries in itertools.groupby(client_entries, key=lambda entry: entry[:2]):
+            table[prefix + output_name.split(":", 1)[1]] = [input_name for _, _, input_name in port_entries]
+        with profiling.phase("format_toml"):
+            text = toml.dumps({client: table})
+        if not first:
+            yield "\n"
+        first = False
+        yield text
+
+
+def dumps(jh: 'JackHandler', connections_backend="jacklib", since: Optional[Iterable[Tuple[str, str]]] = None) -> str:
+    """Return the current connections of ``jh`` as a TOML string, see ``iter_dump``."""
+    return "".join(iter_dump(jh, connections_backend=connections_backend, since=since))
+
+def dump(connections_backend="jacklib", jh: Optional[JackHandler] = None, since_path=None, output_path=None,
+         server_name: Optional[str] = None):
+    """
+    Write the current connections as TOML to ``output_path``, or to stdout if not given.
 
-    # Convert dictionary to TOML and print
-    toml_str = toml.dumps(formatted_connections)
-    print(toml_str)
+    If ``since_path`` names an earlier dump, only the connections that changed since are written.
+    Without ``jh``, a handler for ``server_name`` (default: the default server) is opened and closed.
+    """
+    since = config_edges(since_path) if since_path else None
+    own_handler = jh is None
+    if own_handler:
+        jh = JackHandler(server_name)
+    try:
+        with (open(output_path, "w") if output_path else contextlib.nullcontext(sys.stdout)) as f:
+            for chunk in iter_dump(jh, connections_backend=connections_backend, since=since):
+                f.write(chunk)
+    finally:
+        if own_handler:
+            jh.close()
 
 def main():
     # Create the argument parser object.
@@ -412,25 +1579,164 @@ def main():
 
     parser.add_argument('-d', '--dump', action="store_true",
                         help='Dump the current connections into a TOML configuration file. Provide the path to save the file.')
+    parser.add_argument('-o', '--output', default=None, metavar='FILE',
+                        help='With -d/--dump, write the TOML to FILE instead of stdout')
+    parser.add_argument('--since', default=None, metavar='PREVIOUS_DUMP',
+                        help='With -d/--dump, only write connections added or removed (as disconnect: entries) since PREVIOUS_DUMP')
     parser.add_argument('-r', '--regex', action="store_true", default=False,
                         help=f'Use regular expressions for client and port name matching')
     parser.add_argument('-x', '--disconnect', action="store_true", default=False,
-                        help=f'Disconnect all existing connections before adding new')
+                        help=f'Disconnect all existing connections that are not part of the config')
+    parser.add_argument('-n', '--dry-run', action="store_true", default=False,
+                        help='Only print the planned changes of -l/--load, do not apply them')
+    parser.add_argument('-t', '--transactional', action="store_true", default=False,
+                        help="Apply the changes all or nothing, making new connections before breaking old ones, "
+                             "and roll back on the first failure.")
+    parser.add_argument('--no-cache', dest='use_cache', action="store_false", default=True,
+                        help='Always parse the TOML config instead of reusing the compiled rule table cached next to it')
+    parser.add_argument('--connections-backend', choices=["jacklib", "jack_lsp"], default="jacklib",
+                        help='How to read the current connections: in-process via jacklib (default) or by parsing jack_lsp -c output')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of threads applying connection changes; 1 (default) applies them sequentially')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='How often a connect/disconnect failing with a transient error code is retried (default: 2). '
+                             'libjack reports nearly every failure as -1, which is not retried')
+    parser.add_argument('--stats', action="store_true", default=False,
+                        help='Print timing statistics of the applied changes to stderr')
+    parser.add_argument('--timings', nargs='?', const='-', default=None, metavar='FILE',
+                        help='Write per-phase timings, counters and jacklib call counts of -l/-d as JSON to FILE, or to stderr if no FILE is given')
+    parser.add_argument('--profile', default=None, metavar='FILE',
+                        help='Run -l/-d under cProfile and write the stats to FILE')
+    parser.add_argument('-w', '--watch', action="store_true", default=False,
+                        help='With -l/--load, keep running and apply the config to ports as they appear')
+    parser.add_argument('--debounce', type=float, default=0.25,
+                        help='In watch mode, seconds to wait for further new ports before applying a batch (default: 0.25)')
+    parser.add_argument('--serve', action="store_true", default=False,
+                        help='Run as a daemon that keeps one JACK client open and serves load/dump requests')
+    parser.add_argument('-D', '--via-daemon', action="store_true", default=False,
+                        help='Send -l/--load or -d/--dump to a running jackmesh daemon instead of opening a JACK client')
+    parser.add_argument('--socket', default=None,
+                        help='Unix socket of the daemon. Defaults to $XDG_RUNTIME_DIR/jackmesh.sock')
+    parser.add_argument('--latency', nargs='?', type=int, const=10, default=None, metavar='N',
+                        help="Report the N slowest signal chains (default: 10) and all feedback loops of the current graph.")
+    parser.add_argument('-s', '--server', action="append", default=[], metavar='NAME',
+                        help='Name of the JACK server to use instead of the default one. Repeat it to apply '
+                             '-l/--load to several servers in parallel')
 
     # Parse the provided arguments.
     args = parser.parse_args()
 
+    if args.serve:
+        if args.load or args.dump or args.latency is not None or args.via_daemon:
+            parser.error("'--serve' can't be combined with '-l/--load', '-d/--dump', '--latency' or '-D/--via-daemon'.")
+        from jackmesh.daemon import JackmeshDaemon
+        if len(args.server) > 1:
+            parser.error("'--serve' takes at most one '-s/--server'.")
+        server_name = args.server[0] if args.server else None
+        JackmeshDaemon(connections_backend=args.connections_backend, server_name=server_name).serve(args.socket)
+        return
+
     # Check if neither argument is provided.
-    if not (args.load or args.dump):
-        parser.error("You must provide either '-l/--load' or '-d/--dump' argument.")
-    # Check if both arguments are provided.
-    elif args.load and args.dump:
-        parser.error("You can only provide either '-l/--load' or '-d/--dump' at a time, not both.")
-
-    if args.dump:
-        dump()
-    elif args.load:
-        load(args.load, regex_matching=args.regex, disconnect=args.disconnect)
+    analyze_latency = args.latency is not None
+    if not (args.load or args.dump or analyze_latency):
+        parser.error("You must provide either '-l/--load', '-d/--dump' or '--latency' argument.")
+    # Check if more than one of them is provided.
+    elif sum(map(bool, (args.load, args.dump, analyze_latency))) > 1:
+        parser.error("You can only provide one of '-l/--load', '-d/--dump' and '--latency' at a time.")
+
+    if (args.output or args.since) and not args.dump:
+        parser.error("'-o/--output' and '--since' require '-d/--dump'.")
+
+    profiled = args.timings is not None or args.profile is not None
+    if profiled and (args.watch or args.via_daemon):
+        parser.error("'--timings' and '--profile' can't be combined with '-w/--watch' or '-D/--via-daemon'.")
+
+    if args.workers < 1:
+        parser.error("'--workers' must be at least 1.")
+    if args.transactional and (args.workers > 1 or not args.load):
+        parser.error("'-t/--transactional' requires '-l/--load' and applies changes one at a time, "
+                     "so it can't be combined with '--workers'.")
+
+    if analyze_latency and args.via_daemon:
+        parser.error("'--latency' can't be combined with '-D/--via-daemon'.")
+    if args.via_daemon and args.server:
+        parser.error("'-s/--server' can't be combined with '-D/--via-daemon'; pass it to the daemon instead.")
+    server_name = args.server[0] if len(args.server) == 1 else None
+    if len(args.server) > 1:
+        if not args.load or args.watch or profiled:
+            parser.error("Several '-s/--server' require '-l/--load' and can't be combined with '-w/--watch', "
+                         "'--timings' or '--profile'.")
+        from jackmesh.fanout import fan_out
+        report = fan_out(args.load, args.server, regex_matching=args.regex, disconnect=args.disconnect,
+                         connections_backend=args.connections_backend, dry_run=args.dry_run,
+                         use_cache=args.use_cache, workers=args.workers, retries=args.retries,
+                         transactional=args.transactional)
+        for result in report.results:
+            if result.output:
+                print(f"[{result.server}]")
+                print(result.output, end="")
+        print(report.summary())
+        if not report.ok:
+            parser.exit(1, f"{len(report.failures)} server(s) failed\n")
+        return
+
+    if args.watch:
+        if not args.load or args.via_daemon or args.dry_run or args.transactional:
+            parser.error("'-w/--watch' requires '-l/--load' and can't be combined with '-D/--via-daemon', "
+                         "'-n/--dry-run' or '-t/--transactional'.")
+        from jackmesh.watch import watch
+        watch(args.load, regex_matching=args.regex, disconnect=args.disconnect, debounce=args.debounce,
+              use_cache=args.use_cache, server_name=server_name)
+        return
+
+    if args.via_daemon:
+        from jackmesh.daemon import send_request
+        if args.dump:
+            request = {"command": "dump", "since": os.path.abspath(args.since) if args.since else None}
+        else:
+            request = {"command": "load", "config_path": os.path.abspath(args.load), "regex_matching": args.regex,
+                       "disconnect": args.disconnect, "dry_run": args.dry_run, "transactional": args.transactional}
+        try:
+            response = send_request(request, args.socket)
+        except OSError as e:
+            parser.exit(1, f"Could not reach the jackmesh daemon: {e}\n")
+        if args.output and response["ok"]:
+            with open(args.output, "w") as f:
+                f.write(response["output"])
+        else:
+            print(response["output"], end="")
+        if not response["ok"]:
+            parser.exit(1, f"jackmesh daemon: {response['error']}\n")
+        if response.get("plan", {}).get("failed"):
+            parser.exit(1, f"{response['plan']['failed']} connection change(s) failed\n")
+        return
+
+    with profiling.profiling(cprofile_path=args.profile) if profiled else contextlib.nullcontext() as profile:
+        if args.dump:
+            dump(connections_backend=args.connections_backend, since_path=args.since, output_path=args.output,
+                 server_name=server_name)
+            plan = None
+        elif analyze_latency:
+            from jackmesh.latency import report
+            report(top=args.latency, connections_backend=args.connections_backend, server_name=server_name)
+            plan = None
+        else:
+            executor = ConnectionExecutor(workers=args.workers, retries=args.retries)
+            plan = load(args.load, regex_matching=args.regex, disconnect=args.disconnect,
+                        connections_backend=args.connections_backend, dry_run=args.dry_run, executor=executor,
+                        use_cache=args.use_cache, server_name=server_name, transactional=args.transactional)
+
+    if args.timings == '-':
+        print(profile.to_json(), file=sys.stderr)
+    elif args.timings is not None:
+        with open(args.timings, "w") as f:
+            f.write(profile.to_json() + "\n")
+
+    if plan is not None and plan.report is not None:
+        if args.stats:
+            print(plan.report.summary(), file=sys.stderr)
+        if not plan.report.ok:
+            parser.exit(1, f"{len(plan.report.failures)} connection change(s) failed\n")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,280 @@
+"""
+Latency analysis of the JACK connection graph.
+
+Signal flows along the connections, and through clients: each input port of a client is assumed
+to feed each of its output ports. Physical and terminal ports don't pass signal on, since that is
+where it enters or leaves the graph. A client's internal routes go through one node per client,
+so the graph stays linear in the number of ports and connections.
+
+JACK's latency ranges are cumulative: the capture latency of a port is the latency of the signal
+on its way there from the capture ports, the playback latency that of the rest of its way to the
+playback ports. Summing them along a chain would count the same latency many times, so every port
+is weighted with the latency it adds by itself (unless another ``weight`` is given): a port where
+signal enters the graph adds its capture latency, one where it leaves its playback latency, and
+an output port of a client adds the difference between its capture latency and the highest one
+of the client's inputs, which is the client's own latency. The slowest chain from each source, a port that gets no signal from elsewhere, is found
+in a single pass of Tarjan's algorithm: it completes strongly connected components in reverse
+topological order, so when a port is reached, the slowest chains of everything downstream are
+already known. Components of more than one node are feedback loops. Chains don't go around
+loops: the connections inside a loop are left out when computing them.
+
+    jackmesh --latency 5
+"""
+import heapq
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import profiling
+from .jackmesh import JackHandler, Port
+
+
+class LatencyPath:
+    """A chain of ports and the sum of the latencies they add, in frames."""
+
+    __slots__ = ("ports", "latency")
+
+    def __init__(self, ports: List[Port], latency: int):
+        self.ports = ports
+        self.latency = latency
+
+    def __repr__(self) -> str:
+        return f"LatencyPath(latency={self.latency}, ports={[port.name for port in self.ports]})"
+
+    def describe(self) -> str:
+        return f"{self.latency:>8}  " + " -> ".join(port.name for port in self.ports)
+
+
+class LatencyReport:
+    """The slowest chains, slowest first, and the feedback loops of one connection graph."""
+
+    def __init__(self, chains: List[LatencyPath], loops: List[LatencyPath], ports: int, connections: int):
+        self.chains = chains
+        # Each loop is given as one cycle through it, starting and ending at the same port.
+        self.loops = loops
+        self.ports = ports
+        self.connections = connections
+
+    def summary(self) -> str:
+        lines = [f"{self.ports} connected ports, {self.connections} connections, {len(self.loops)} feedback loop(s)"]
+        if self.chains:
+            lines.append("Slowest chains (latency in frames):")
+            lines.extend(chain.describe() for chain in self.chains)
+        if self.loops:
+            lines.append("Feedback loops (round trip latency in frames):")
+            lines.extend(loop.describe() for loop in self.loops)
+        return "\n".join(lines)
+
+
+def analyze_latency(connections: Iterable[Tuple[Port, Port]], top: int = 10,
+                    weight: Optional[Callable[[Port], int]] = None) -> LatencyReport:
+    """
+    Find the ``top`` slowest source to sink chains and all feedback loops among ``connections``.
+
+    ``connections`` are ``(output, input)`` port pairs. ``weight`` returns the latency a port adds
+    to a chain; by default it is derived from the ports' latency ranges as described above. Runs
+    in time linear in the number of connected ports and connections, plus ``top`` log ``top``
+    for the ranking.
+    """
+    # Nodes are the connected ports, followed by one node per client that passes signal through.
+    nodes: List[Optional[Port]] = []
+    succ: List[List[int]] = []
+    node_of: Dict[int, int] = {}
+
+    def node(port: Port) -> int:
+        index = node_of.get(port.id)
+        if index is None:
+            index = node_of[port.id] = len(nodes)
+            nodes.append(port)
+            succ.append([])
+        return index
+
+    edge_count = 0
+    for output, input in connections:
+        succ[node(output)].append(node(input))
+        edge_count += 1
+    port_count = len(nodes)
+
+    clients: Dict[str, Tuple[List[int], List[int]]] = {}
+    for index in range(port_count):
+        port = nodes[index]
+        if not port.is_endpoint:
+            inputs, outputs = clients.setdefault(port.client, ([], []))
+            (inputs if port.direction == "input" else outputs).append(index)
+    for inputs, outputs in clients.values():
+        if inputs and outputs:
+            hub = len(nodes)
+            nodes.append(None)
+            succ.append(outputs)
+            for index in inputs:
+                succ[index].append(hub)
+
+    with profiling.phase("latency_weights"):
+        if weight is not None:
+            weights = [0 if port is None else weight(port) for port in nodes]
+        else:
+            weights = _own_latencies(nodes, port_count, clients.values())
+
+    with profiling.phase("latency_paths"):
+        component, slowest, next_node, loops = _slowest_chains(succ, weights)
+
+    has_source = [False] * len(nodes)
+    for index, targets in enumerate(succ):
+        for target in targets:
+            if component[target] != component[index]:
+                has_source[target] = True
+    # A source whose only connections are inside a loop has no chain to speak of.
+    sources = [index for index in range(port_count) if not has_source[index] and next_node[index] != -1]
+
+    chains = []
+    for source in heapq.nlargest(top, sources, key=slowest.__getitem__):
+        ports = []
+        index = source
+        while index != -1:
+            if nodes[index] is not None:
+                ports.append(nodes[index])
+            index = next_node[index]
+        chains.append(LatencyPath(ports, slowest[source]))
+
+    cycles = []
+    for members in loops:
+        # Ports come before client nodes, so the cycle starts and ends at a port.
+        cycle = _find_cycle(min(members), succ, component)
+        ports = [nodes[index] for index in cycle if nodes[index] is not None]
+        cycles.append(LatencyPath(ports, sum(weights[index] for index in cycle[:-1])))
+    cycles.sort(key=lambda loop: loop.latency, reverse=True)
+    return LatencyReport(chains, cycles, port_count, edge_count)
+
+
+def _own_latencies(nodes: List[Optional[Port]], port_count: int,
+                   clients: Iterable[Tuple[List[int], List[int]]]) -> List[int]:
+    """Return the latency every node adds by itself, from the cumulative latency ranges of the ports."""
+    weights = [0] * len(nodes)
+    for index in range(port_count):
+        port = nodes[index]
+        if port.is_endpoint:
+            weights[index] = port.in_latency if port.direction == "output" else port.out_latency
+    for inputs, outputs in clients:
+        upstream = max((nodes[index].in_latency for index in inputs), default=0)
+        for index in outputs:
+            weights[index] = max(0, nodes[index].in_latency - upstream)
+    return weights
+
+
+def _slowest_chains(succ: List[List[int]], weights: List[int]):
+    """
+    Run Tarjan's algorithm iteratively over the graph ``succ``.
+
+    Returns the component of every node, the latency of the slowest chain starting at it, the
+    next node on that chain (-1 at its end) and the members of every component with a cycle.
+    """
+    count = len(succ)
+    order = [-1] * count
+    low = [0] * count
+    component = [-1] * count
+    position = [0] * count
+    slowest = [0] * count
+    next_node = [-1] * count
+    on_stack = [False] * count
+    stack: List[int] = []
+    loops: List[List[int]] = []
+    counter = 0
+
+    for root in range(count):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [root]
+        while work:
+            v = work[-1]
+            targets = succ[v]
+            if position[v] < len(targets):
+                u = targets[position[v]]
+                position[v] += 1
+                if order[u] == -1:
+                    order[u] = low[u] = counter
+                    counter += 1
+                    stack.append(u)
+                    on_stack[u] = True
+                    work.append(u)
+                elif on_stack[u] and order[u] < low[v]:
+                    low[v] = order[u]
+                continue
+
+            work.pop()
+            if work and low[v] < low[work[-1]]:
+                low[work[-1]] = low[v]
+            if low[v] != order[v]:
+                continue
+            members = []
+            while True:
+                u = stack.pop()
+                on_stack[u] = False
+                component[u] = v
+                members.append(u)
+                if u == v:
+                    break
+            # Everything reachable from this component outside of it is complete already.
+            for u in members:
+                best, best_next = 0, -1
+                for target in succ[u]:
+                    if component[target] != v and (best_next == -1 or slowest[target] > best):
+                        best, best_next = slowest[target], target
+                slowest[u] = weights[u] + best
+                next_node[u] = best_next
+            if len(members) > 1:
+                loops.append(members)
+    return component, slowest, next_node, loops
+
+
+def _find_cycle(start: int, succ: List[List[int]], component: List[int]) -> List[int]:
+    """Return a shortest cycle from ``start`` back to itself within its strongly connected component."""
+    parent = {start: -1}
+    queue = deque([start])
+    while queue:
+        v = queue.popleft()
+        for u in succ[v]:
+            if component[u] != component[start]:
+                continue
+            if u == start:
+                cycle = [start]
+                while v != -1:
+                    cycle.append(v)
+                    v = parent[v]
+                cycle.reverse()
+                return cycle
+            if u not in parent:
+                parent[u] = v
+                queue.append(u)
+    raise ValueError(f"Node {start} is not on a cycle")
+
+
+def analyze(jh: JackHandler, top: int = 10, connections_backend="jacklib",
+            weight: Optional[Callable[[Port], int]] = None) -> LatencyReport:
+    """Analyze the current connection graph of ``jh``, see ``analyze_latency``."""
+    jh.refresh_ports()
+    registry = jh.get_port_registry()
+    table = jh.get_edge_table(backend=connections_backend)
+    by_id = registry.by_id
+    return analyze_latency(((by_id[output], by_id[input]) for output, input in table.pairs()), top=top, weight=weight)
+
+
+def report(top: int = 10, connections_backend="jacklib", jh: Optional[JackHandler] = None,
+           server_name: Optional[str] = None) -> LatencyReport:
+    """
+    Analyze the current connection graph and print the report.
+
+    Without ``jh``, a handler for ``server_name`` (default: the default server) is opened and closed.
+    """
+    own_handler = jh is None
+    if own_handler:
+        jh = JackHandler(server_name)
+    try:
+        result = analyze(jh, top=top, connections_backend=connections_backend)
+    finally:
+        if own_handler:
+            jh.close()
+    print(result.summary())
+    return result
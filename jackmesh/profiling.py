@@ -0,0 +1,130 @@
+"""
+Phase timers and counters for finding out where a slow ``load`` or ``dump`` spends its time.
+
+The hot paths of jackmesh wrap their work in ``phase(name)`` and report sizes through
+``count(name, n)``. Both do nothing unless a Profile is active:
+
+    with profiling() as profile:
+        load("scene.toml")
+    print(profile.to_json())
+
+While active, every jacklib function call is counted as well, and a cProfile dump can be
+written alongside. Phases may nest (``resolve`` can trigger ``enumerate_ports``), so their times
+are inclusive and don't necessarily add up to the wall time.
+"""
+import contextlib
+import cProfile
+import json
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+_active: Optional['Profile'] = None
+_NO_PHASE = contextlib.nullcontext()
+
+
+class Profile:
+    """Accumulated phase timings, counters and jacklib call counts of one profiled run."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Counter = Counter()
+        self.jacklib_calls: Counter = Counter()
+        self.wall_s = 0.0
+        self.cprofile_path: Optional[str] = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += time.perf_counter() - start
+            entry["calls"] += 1
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def to_dict(self) -> Dict:
+        return {
+            "wall_s": self.wall_s,
+            "phases": self.phases,
+            "counters": dict(self.counters),
+            "jacklib_calls": dict(self.jacklib_calls),
+            "jacklib_calls_total": sum(self.jacklib_calls.values()),
+            "cprofile": self.cprofile_path,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True)
+
+
+def phase(name: str):
+    """Time the enclosed block as ``name`` if profiling is active."""
+    if _active is None:
+        return _NO_PHASE
+    return _active.phase(name)
+
+
+def count(name: str, n: int = 1):
+    """Add ``n`` to the counter ``name`` if profiling is active."""
+    if _active is not None:
+        _active.count(name, n)
+
+
+class _CountingModule:
+    """Stands in for the jacklib module and counts calls to its functions."""
+
+    def __init__(self, module, calls: Counter):
+        self._module = module
+        self._calls = calls
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if callable(attr) and not isinstance(attr, type):
+            func, calls = attr, self._calls
+
+            def counted(*args, **kwargs):
+                calls[name] += 1
+                return func(*args, **kwargs)
+
+            attr = counted
+        # Cache on the instance, so later lookups don't go through __getattr__ again.
+        setattr(self, name, attr)
+        return attr
+
+
+@contextlib.contextmanager
+def profiling(cprofile_path: Optional[str] = None):
+    """
+    Profile everything jackmesh does inside the block and yield the Profile being filled.
+
+    Args:
+        cprofile_path: If given, the block also runs under cProfile and the stats are written to
+                       this file, for ``python -m pstats`` or snakeviz.
+    """
+    from jackmesh import jackmesh
+
+    global _active
+    if _active is not None:
+        raise RuntimeError("Profiling is already active")
+
+    profile = Profile()
+    profile.cprofile_path = cprofile_path
+    profiler = cProfile.Profile() if cprofile_path else None
+    saved_jacklib = jackmesh.jacklib
+    jackmesh.jacklib = _CountingModule(saved_jacklib, profile.jacklib_calls)
+    _active = profile
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+        profile.wall_s = time.perf_counter() - start
+        _active = None
+        jackmesh.jacklib = saved_jacklib
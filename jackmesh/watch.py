@@ -0,0 +1,222 @@
+"""
+Watch mode: keep enforcing a connection config as JACK clients come and go.
+
+The config is parsed once and kept resident. When ports appear, only the rules that can match
+them are resolved, and only for the new ports. Notifications are debounced, so a client that
+registers 64 ports is handled as one batch.
+"""
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from .executor import ConnectionExecutor
+from .jackmesh import (JackHandler, Port, PortConnection, PortMatcher, Rule, _compile_port_regex,
+                       _parse_port_spec, _regex_literal_prefix, load_rules, plan_connections, resolve_rules)
+
+
+class RuleIndex:
+    """
+    Maps a port to the rules that may apply to it, without testing every rule.
+
+    Exact specs are indexed by full port name, alias and UUID specs by alias and UUID, and regex
+    specs by the client named in their literal prefix. Regexes without a client in their prefix are
+    kept in a short list that is checked against every port.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        # direction -> key -> rules
+        self._exact: Dict[str, Dict[str, List[Rule]]] = {"output": {}, "input": {}}
+        self._by_alias: Dict[str, Dict[str, List[Rule]]] = {"output": {}, "input": {}}
+        self._by_uuid: Dict[str, Dict[str, List[Rule]]] = {"output": {}, "input": {}}
+        self._by_client: Dict[str, Dict[str, List[Rule]]] = {"output": {}, "input": {}}
+        self._by_prefix: Dict[str, List[tuple]] = {"output": [], "input": []}
+
+        for rule in rules:
+            self._add(rule, rule.output_spec, "output")
+            for inp in rule.inputs:
+                self._add(rule, inp, "input")
+
+    def _add(self, rule: Rule, port_spec: str, direction: str):
+        kind, value = _parse_port_spec(port_spec)
+        if kind != "regex":
+            index = {"name": self._exact, "alias": self._by_alias, "uuid": self._by_uuid}[kind]
+            index[direction].setdefault(value, []).append(rule)
+            return
+        prefix = _regex_literal_prefix(value)
+        if ":" in prefix:
+            self._by_client[direction].setdefault(prefix.split(":", 1)[0], []).append(rule)
+        else:
+            self._by_prefix[direction].append((prefix, rule))
+
+    def candidates(self, port: Port) -> List[Rule]:
+        """Return the rules that might match ``port`` on its side of a connection, without duplicates."""
+        direction = port.direction
+        rules = list(self._exact[direction].get(port.name, ()))
+        # Aliases and UUIDs are lazy port attributes, so only ask for them if some rule needs them.
+        if self._by_alias[direction]:
+            for alias in port.aliases:
+                rules.extend(self._by_alias[direction].get(alias, ()))
+        if self._by_uuid[direction]:
+            rules.extend(self._by_uuid[direction].get(str(port.uuid), ()))
+        rules.extend(self._by_client[direction].get(port.client, ()))
+        rules.extend(rule for prefix, rule in self._by_prefix[direction] if port.name.startswith(prefix))
+        return list({id(rule): rule for rule in rules}.values())
+
+
+def spec_matches(port_spec: str, port: Port) -> bool:
+    """Check a single ``client:port``, ``regex:``, ``alias:`` or ``uuid:`` spec against one port."""
+    kind, value = _parse_port_spec(port_spec)
+    if kind == "regex":
+        return _compile_port_regex(value).match(port.name) is not None
+    if kind == "alias":
+        return value in port.aliases
+    if kind == "uuid":
+        return str(port.uuid) == value
+    return port_spec == port.name
+
+
+class _EventBatcher:
+    """Collects port names from the notification thread and hands them out in debounced batches."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._names: Set[str] = set()
+
+    def add(self, name: str):
+        with self._condition:
+            self._names.add(name)
+            self._condition.notify()
+
+    def wait_batch(self, debounce: float, max_delay: float, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Wait for port names and return them once no new name arrived for ``debounce`` seconds,
+        or ``max_delay`` seconds after the first one at the latest. Returns an empty set on timeout.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._names, timeout=timeout):
+                return set()
+            deadline = time.monotonic() + max_delay
+            while True:
+                seen = len(self._names)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait_for(lambda: len(self._names) != seen,
+                                                                  timeout=min(debounce, remaining)):
+                    break
+            names, self._names = self._names, set()
+            return names
+
+
+class Watcher:
+    """
+    Applies a set of rules to ports as they appear on a tracking JackHandler.
+
+    Args:
+        jh: The handler to use. Graph tracking is enabled on it if needed.
+        rules: The rules to enforce, as returned by ``compile_rules`` or ``load_rules``.
+        regex_matching: Whether ``regex:`` specs are allowed.
+        disconnect: If True, connections of new ports that no rule asks for are removed.
+        executor: How to apply the changes, see ``ConnectionPlan.execute``.
+    """
+
+    def __init__(self, jh: JackHandler, rules: List[Rule], regex_matching: bool = False, disconnect: bool = False,
+                 executor: Optional[ConnectionExecutor] = None):
+        self.jh = jh
+        self.executor = executor
+        self.rules = rules
+        self.regex_matching = regex_matching
+        self.disconnect = disconnect
+        self.index = RuleIndex(rules)
+        self._batcher = _EventBatcher()
+
+        if not jh.tracking:
+            jh.enable_tracking()
+        jh.add_graph_listener(self._on_graph_change)
+
+    def _on_graph_change(self, kind, *args):
+        if kind == "add_port":
+            self._batcher.add(args[0].name)
+        elif kind == "rename_port":
+            self._batcher.add(args[1])
+
+    def apply_all(self):
+        """Apply every rule to the whole graph, like a one-shot ``load``."""
+        wanted, unwanted = resolve_rules(self.jh, self.rules, regex_matching=self.regex_matching)
+        self._execute(self.jh.get_jack_connections(), wanted, unwanted, disconnect_others=self.disconnect)
+
+    def apply_to_ports(self, port_names: Iterable[str]):
+        """Apply only the rules that can match the given ports, and only to connections touching them."""
+        registry = self.jh.get_port_registry()
+        ports = [port for port in (registry.get(name) for name in port_names) if port is not None]
+        if not ports:
+            return
+
+        matcher = PortMatcher(self.jh, regex_matching=self.regex_matching)
+        wanted, unwanted = set(), set()
+        for port in ports:
+            for rule in self.index.candidates(port):
+                target = unwanted if rule.is_disconnect else wanted
+                if port.direction == "output":
+                    if not spec_matches(rule.output_spec, port):
+                        continue
+                    for inp in rule.inputs:
+                        for input_port in matcher.resolve(inp, "input"):
+                            target.add(PortConnection(port.client_ptr, output=port, input=input_port))
+                elif any(spec_matches(inp, port) for inp in rule.inputs):
+                    for output_port in matcher.resolve(rule.output_spec, "output"):
+                        target.add(PortConnection(output_port.client_ptr, output=output_port, input=port))
+
+        # Only the connections of the new ports are considered, so -x leaves the rest of the graph alone.
+        existing = self.jh.get_port_connections(port.name for port in ports)
+        self._execute(existing, wanted, unwanted, disconnect_others=self.disconnect)
+
+    def _execute(self, existing, wanted, unwanted, disconnect_others):
+        plan = plan_connections(existing, wanted, unwanted, disconnect_others=disconnect_others)
+        if plan.is_empty():
+            return
+        self.jh.record_report(plan.execute(self.executor))
+
+    def run(self, debounce: float = 0.25, max_delay: float = 2.0):
+        """Apply the whole config once, then handle new ports in batches until interrupted."""
+        self.apply_all()
+        while True:
+            names = self._batcher.wait_batch(debounce, max_delay)
+            try:
+                self.apply_to_ports(names)
+            except Exception as e:
+                # One failing batch must not end the watch.
+                print(f"Error applying connections for new ports: {e}", file=sys.stderr)
+
+
+def watch(config_path, regex_matching=False, disconnect=False, debounce=0.25, jh: Optional[JackHandler] = None,
+          use_cache=True, server_name: Optional[str] = None):
+    """
+    Load JACK connections from a TOML configuration file and keep enforcing them until interrupted.
+
+    Args:
+        config_path (str): The path to the TOML configuration file.
+        regex_matching (bool, optional): If True, allows regular expressions in port specs. Defaults to False.
+        disconnect (bool, optional): If True, connections that are not part of the config are removed,
+                                     initially from the whole graph and later from newly appearing ports.
+                                     Defaults to False.
+        debounce (float, optional): Seconds to wait for further port registrations before applying
+                                    a batch. Defaults to 0.25.
+        jh (JackHandler, optional): The handler to use. A new one is opened if not given.
+        use_cache (bool, optional): If True, the compiled rule table cached next to the config is used,
+                                    see ``load_rules``. Defaults to True.
+        server_name (str, optional): The JACK server to watch if no ``jh`` is given. Defaults to the
+                                     default server.
+    """
+    own_handler = jh is None
+    if own_handler:
+        jh = JackHandler(server_name)
+    rules = [rule for rule in load_rules(config_path, regex_matching=regex_matching, use_cache=use_cache)
+             if rule.applies_to(jh.server_name)]
+    watcher = Watcher(jh, rules, regex_matching=regex_matching, disconnect=disconnect)
+    try:
+        watcher.run(debounce=debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if own_handler:
+            jh.close()
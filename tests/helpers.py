@@ -0,0 +1,33 @@
+"""Fixtures shared by the tests."""
+import os
+import tempfile
+import toml
+from jackmesh.fakejack import FakeJackServer
+
+
+def temp_dir(test) -> str:
+    """Create a temporary directory that is removed with everything in it when ``test`` is done."""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return directory.name
+
+
+class FakeServerMixin:
+    """
+    Gives every test a fresh synthetic fake server and a config path in a temporary directory.
+
+    Four clients with two output and two input ports each, every output connected to the next
+    client's input of the same number.
+    """
+
+    config_name = "scene.toml"
+
+    def setUp(self):
+        super().setUp()
+        self.server = FakeJackServer.synthetic(clients=4, ports_per_client=2, fanout=1)
+        self.tmpdir = temp_dir(self)
+        self.config_path = os.path.join(self.tmpdir, self.config_name)
+
+    def write_config(self, config):
+        with open(self.config_path, "w") as f:
+            toml.dump(config, f)
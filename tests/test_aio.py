@@ -0,0 +1,54 @@
+import contextlib
+import io
+import unittest
+from contextlib import redirect_stdout
+from jackmesh import aio
+from jackmesh.aio import AsyncJackHandler
+from tests.helpers import FakeServerMixin
+
+
+class TestAsyncApi(FakeServerMixin, unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        super().setUp()
+        installed = self.server.installed()
+        installed.__enter__()
+        self.addCleanup(installed.__exit__, None, None, None)
+
+    async def test_load_events_stream_without_printing(self):
+        self.write_config({"client0": {"out_0": ["client2:in_1", "client9:in_0"]}})
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            async with AsyncJackHandler() as jh:
+                events = [event async for event in jh.load_events(self.config_path)]
+                dumped = await jh.dump()
+
+        self.assertEqual([event.kind for event in events], ["warning", "plan", "edge", "done"])
+        self.assertEqual(events[0].message, "Could not find any port for: client9:in_0")
+        self.assertEqual(events[2].result.connection.input.name, "client2:in_1")
+        self.assertTrue(events[3].plan.report.ok)
+        self.assertIn('out_0 = [ "client1:in_0", "client2:in_1",]', dumped)
+        self.assertEqual(stdout.getvalue(), "")
+
+    async def test_closing_the_iterator_stops_applying(self):
+        self.write_config({})
+        async with AsyncJackHandler() as jh:
+            await jh.get_jack_ports()
+            self.server.call_latency = 0.02
+            async with contextlib.aclosing(jh.load_events(self.config_path, disconnect=True)) as events:
+                async for event in events:
+                    if event.kind == "edge":
+                        break
+        # The load stopped after the change in flight, instead of removing all 8 connections
+        self.assertGreaterEqual(len(self.server.edges()), 6)
+
+    async def test_timeout_cancels_the_load(self):
+        self.write_config({})
+        self.server.call_latency = 0.005
+        with self.assertRaises(TimeoutError):
+            await aio.load(self.config_path, disconnect=True, timeout=0.05)
+        self.assertEqual(len(self.server.edges()), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
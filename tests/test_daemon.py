@@ -0,0 +1,61 @@
+import os
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from jackmesh.daemon import JackmeshDaemon, send_request
+from jackmesh.jackmesh import ConnectionPlan
+from tests.helpers import temp_dir
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.jh = MagicMock()
+        self.daemon = JackmeshDaemon(jh=self.jh)
+        self.socket_path = os.path.join(temp_dir(self), "jackmesh.sock")
+
+    def serve_in_background(self):
+        server = self.daemon.make_server(self.socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+    @patch('jackmesh.daemon.load')
+    def test_load_reuses_handler(self, mock_load):
+        mock_load.side_effect = lambda *args, **kwargs: print("Connecting A:out to B:in...") or \
+            ConnectionPlan({MagicMock()}, set(), set(), set())
+        self.serve_in_background()
+
+        for _ in range(2):
+            response = send_request({"command": "load", "config_path": "/tmp/scene.toml", "disconnect": True},
+                                    self.socket_path, timeout=5)
+            self.assertTrue(response["ok"])
+            self.assertEqual(response["output"], "Connecting A:out to B:in...\n")
+            self.assertEqual(response["plan"], {"connect": 1, "disconnect": 0, "unchanged": 0, "not_found": 0})
+
+        # The same handler serves every request and is only refreshed, never reopened
+        self.assertEqual(self.jh.refresh_ports.call_count, 2)
+        for call in mock_load.call_args_list:
+            self.assertIs(call.kwargs["jh"], self.jh)
+            self.assertTrue(call.kwargs["disconnect"])
+
+    @patch('jackmesh.daemon.dumps')
+    def test_errors_are_reported(self, mock_dumps):
+        mock_dumps.side_effect = RuntimeError("server went away")
+        self.serve_in_background()
+
+        response = send_request({"command": "dump"}, self.socket_path, timeout=5)
+        self.assertFalse(response["ok"])
+        self.assertEqual(response["error"], "server went away")
+
+        response = send_request({"command": "frobnicate"}, self.socket_path, timeout=5)
+        self.assertFalse(response["ok"])
+
+    def test_refuses_to_replace_running_daemon(self):
+        self.serve_in_background()
+        with self.assertRaises(RuntimeError):
+            JackmeshDaemon(jh=MagicMock()).make_server(self.socket_path)
+
+if __name__ == '__main__':
+    unittest.main()
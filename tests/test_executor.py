@@ -0,0 +1,74 @@
+import errno
+import unittest
+from unittest.mock import MagicMock
+from jackmesh.executor import ConnectionExecutor
+from jackmesh.jackmesh import JackConnectionError
+
+
+def make_connection(output, input, failures=()):
+    """A stand-in connection whose connect() raises the given errors first, then succeeds."""
+    connection = MagicMock()
+    connection.output.name = output
+    connection.input.name = input
+    connection.connect.side_effect = list(failures) + [None]
+    return connection
+
+
+class TestConnectionExecutor(unittest.TestCase):
+
+    def test_failures_are_reported_not_raised(self):
+        flaky = make_connection("A:out1", "B:in1", [JackConnectionError("busy", code=errno.EBUSY)])
+        exists = make_connection("A:out2", "B:in1", [JackConnectionError("exists", code=errno.EEXIST)])
+        broken = make_connection("A:out3", "B:in1", [JackConnectionError("busy", code=errno.EBUSY)] * 3)
+        fine = make_connection("A:out4", "B:in1")
+        missing = make_connection("A:out5", "B:gone", [JackConnectionError("no such port", code=-1)])
+
+        report = ConnectionExecutor(retries=2, retry_delay=0).run(connects=[flaky, exists, broken, fine, missing])
+
+        self.assertEqual([r.connection for r in report.results], [flaky, exists, broken, fine, missing])
+        self.assertEqual([r.ok for r in report.results], [True, True, False, True, False])
+        # Transient errors are retried, a missing port is not; an existing connection is already done
+        self.assertEqual([r.attempts for r in report.results], [2, 1, 3, 1, 1])
+        self.assertEqual([r.existed for r in report.results], [False, True, False, False, False])
+        self.assertEqual(report.succeeded("connect"), [flaky, exists, fine])
+        self.assertFalse(report.ok)
+        self.assertEqual(report.stats()["retries"], 3)
+        self.assertIn("failed after 3 attempt(s)", report.log[2])
+
+    def test_worker_pool_keeps_plan_order(self):
+        disconnects = [make_connection(f"A:out{i}", "B:in1") for i in range(10)]
+        connects = [make_connection(f"C:out{i}", "B:in1") for i in range(50)]
+
+        report = ConnectionExecutor(workers=4, batch_size=7).run(disconnects=disconnects, connects=connects)
+
+        self.assertTrue(report.ok)
+        self.assertEqual([r.connection for r in report.results], disconnects + connects)
+        self.assertEqual([r.action for r in report.results], ["disconnect"] * 10 + ["connect"] * 50)
+        self.assertEqual(report.log[0], "Disconnecting A:out0 from B:in1...")
+        self.assertEqual(report.log[10], "Connecting C:out0 to B:in1...")
+        self.assertEqual(set(report.timings), {"disconnect", "connect"})
+        self.assertEqual(report.stats()["edges"], 60)
+
+    def test_transaction_rolls_back_on_failure(self):
+        first = make_connection("A:out1", "B:in1")
+        removed = make_connection("A:out2", "B:in2")
+        broken = make_connection("A:out3", "B:in3", [JackConnectionError("busy", code=errno.EBUSY)] * 3)
+        never = make_connection("A:out4", "B:in4")
+
+        report = ConnectionExecutor(retries=2, retry_delay=0).run_transaction(
+            [("connect", [first]), ("disconnect", [removed]), ("connect", [broken, never])])
+
+        self.assertTrue(report.rolled_back)
+        self.assertEqual([(r.action, r.connection) for r in report.results],
+                         [("connect", first), ("disconnect", removed), ("connect", broken)])
+        never.connect.assert_not_called()
+        # Undone newest first
+        self.assertEqual([(r.action, r.connection) for r in report.rollback], [("connect", removed), ("disconnect", first)])
+        self.assertTrue(report.rollback_ok)
+        self.assertEqual(report.succeeded("connect"), [])
+        self.assertEqual(report.log[-1], "Rolling back: Disconnecting A:out1 from B:in1...")
+        self.assertGreater(report.mutation_window, 0)
+        self.assertIn("rolled back 2 change(s)", report.summary())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+import toml
+from jackmesh.fakejack import FakeJackServer, JackPortIsInput, JackPortIsOutput
+from jackmesh.jackmesh import JackHandler, PlanCache, compile_rules, config_edges, dump, dumps, load
+from jackmesh.watch import Watcher
+from tests.helpers import FakeServerMixin
+
+
+class TestAgainstFakeServer(FakeServerMixin, unittest.TestCase):
+
+    def test_dump_then_load_round_trips(self):
+        with self.server.installed():
+            dumped = dumps(JackHandler())
+            self.write_config(toml.loads(dumped))
+            edges = self.server.edges()
+
+            self.server.remove_connection("client0:out_0", "client1:in_0")
+            with redirect_stdout(io.StringIO()):
+                plan = load(self.config_path)
+
+        self.assertEqual(len(plan.to_connect), 1)
+        self.assertTrue(plan.report.ok)
+        self.assertEqual(self.server.edges(), edges)
+        self.assertEqual(toml.loads(dumped)["client0"], {"out_0": ["client1:in_0"], "out_1": ["client1:in_1"]})
+
+    def test_names_that_only_look_like_prefixed_specs_round_trip(self):
+        for output, input in (("my alias:out.1", "uuid:in"), ("Superalias:out", "alias:in"), ("uuid:out", "Alias:in")):
+            self.server.register_port(output, JackPortIsOutput)
+            self.server.register_port(input, JackPortIsInput)
+            self.server.add_connection(output, input)
+        with self.server.installed():
+            self.write_config(toml.loads(dumps(JackHandler())))
+            edges = self.server.edges()
+            with redirect_stdout(io.StringIO()) as stdout:
+                plan = load(self.config_path, disconnect=True, use_cache=False)
+
+        self.assertEqual(self.server.edges(), edges)
+        self.assertTrue(plan.is_empty())
+        self.assertNotIn("Could not find", stdout.getvalue())
+
+    def test_load_with_disconnect_keeps_wanted_edges(self):
+        self.write_config({"client0": {"regex:out_.*": ["client2:in_0"]}, "client1": {"out_0": ["client2:in_0"]}})
+        with self.server.installed(), redirect_stdout(io.StringIO()):
+            plan = load(self.config_path, regex_matching=True, disconnect=True)
+
+        self.assertEqual(self.server.edges(), {("client0:out_0", "client2:in_0"), ("client0:out_1", "client2:in_0"),
+                                               ("client1:out_0", "client2:in_0")})
+        self.assertEqual(len(plan.unchanged), 1)
+        # Existing connections that stay are never touched
+        self.assertEqual(self.server.calls["connect"], 2)
+
+    def test_load_without_disconnect_enumerates_only_referenced_clients(self):
+        self.write_config({"client0": {"out_0": ["client2:in_1"]}})
+        with self.server.installed(), redirect_stdout(io.StringIO()):
+            load(self.config_path)
+
+        self.assertIn(("client0:out_0", "client2:in_1"), self.server.edges())
+        # port_by_name is called once per enumerated port: client0 and client2 have 4 ports each
+        self.assertEqual(self.server.calls["port_by_name"], 8)
+
+    def test_tracking_follows_server_changes(self):
+        with self.server.installed():
+            jh = JackHandler()
+            jh.enable_tracking()
+            self.server.register_port("late:out", JackPortIsOutput)
+            self.server.register_port("late:in", JackPortIsInput)
+            self.server.add_connection("late:out", "late:in")
+            self.server.rename_port("late:in", "late:renamed")
+            self.server.unregister_client("client3")
+
+            snapshot = jh.get_snapshot()
+            self.assertEqual(snapshot.edges, frozenset(self.server.edges()))
+            self.assertEqual(len(snapshot.ports), len(self.server.ports))
+            # Only the initial scan enumerated the ports
+            self.assertEqual(self.server.calls["get_ports"], 1)
+
+            reads = self.server.calls["port_get_all_connections"]
+            connections = jh.get_port_connections(["late:renamed", "client1:in_0", "gone:port"])
+            self.assertEqual({(c.output.name, c.input.name) for c in connections},
+                             {("late:out", "late:renamed"), ("client0:out_0", "client1:in_0")})
+            self.assertEqual(self.server.calls["port_get_all_connections"], reads)
+            jh.close()
+
+    def test_ports_registered_during_a_rescan_reach_the_watcher(self):
+        with self.server.installed():
+            jh = JackHandler()
+            watcher = Watcher(jh, compile_rules({"client0": {"out_0": ["usb:in_0"]}}))
+            jh.invalidate()
+            get_ports = self.server.get_ports
+
+            def get_ports_while_plugging_in(*args):
+                self.server.register_port("usb:in_0", JackPortIsInput)
+                return get_ports(*args)
+
+            with patch.object(self.server, "get_ports", side_effect=get_ports_while_plugging_in):
+                snapshot = jh.get_snapshot()
+            self.assertIn("usb:in_0", {port.name for port in snapshot.ports})
+            self.assertEqual(watcher._batcher.wait_batch(debounce=0, max_delay=0, timeout=0), {"usb:in_0"})
+            jh.close()
+
+    def test_plan_cache_skips_resolution_while_ports_are_unchanged(self):
+        self.write_config({"client0": {"regex:out_.*": ["client2:in_0"]}})
+        plan_cache = PlanCache()
+        with self.server.installed(), redirect_stdout(io.StringIO()):
+            jh = JackHandler()
+            jh.enable_tracking()
+            load(self.config_path, regex_matching=True, jh=jh, plan_cache=plan_cache)
+            with patch('jackmesh.jackmesh.load_rules') as mock_load_rules:
+                self.server.remove_connection("client0:out_0", "client2:in_0")
+                plan = load(self.config_path, regex_matching=True, jh=jh, plan_cache=plan_cache)
+                mock_load_rules.assert_not_called()
+            self.assertEqual(len(plan.to_connect), 1)
+            self.assertEqual(plan_cache.hits, 1)
+
+            # A new port changes the fingerprint, so the config is resolved again
+            self.server.register_port("client0:out_9", JackPortIsOutput)
+            plan = load(self.config_path, regex_matching=True, jh=jh, plan_cache=plan_cache)
+            jh.close()
+
+        self.assertEqual(plan_cache.misses, 2)
+        self.assertEqual(len(plan.to_connect), 1)
+        self.assertIn(("client0:out_9", "client2:in_0"), self.server.edges())
+
+    def test_dump_is_sorted_and_since_writes_a_loadable_delta(self):
+        previous_path = os.path.join(os.path.dirname(self.config_path), "previous.toml")
+        self.server.add_connection("client1:out_0", "client0:in_0")
+        with self.server.installed():
+            dump(jh=JackHandler(), output_path=previous_path)
+            previous_edges = self.server.edges()
+
+            self.server.remove_connection("client0:out_0", "client1:in_0")
+            self.server.add_connection("client0:out_0", "client3:in_0")
+            delta = dumps(JackHandler(), since=config_edges(previous_path))
+
+        with open(previous_path) as f:
+            previous = f.read()
+        self.assertTrue(previous.startswith('[client0]\nout_0 = [ "client1:in_0",]\n'))
+        self.assertIn('[client1]\nout_0 = [ "client0:in_0", "client2:in_0",]\n', previous)
+        self.assertEqual(toml.loads(delta), {"client0": {"out_0": ["client3:in_0"],
+                                                         "disconnect:out_0": ["client1:in_0"]}})
+
+        # Loading the delta on the earlier graph reproduces the current one
+        current_edges = self.server.edges()
+        self.server = FakeJackServer.synthetic(clients=4, ports_per_client=2, fanout=1)
+        self.server.add_connection("client1:out_0", "client0:in_0")
+        self.assertEqual(self.server.edges(), previous_edges)
+        self.write_config(toml.loads(delta))
+        with self.server.installed(), redirect_stdout(io.StringIO()):
+            load(self.config_path)
+        self.assertEqual(self.server.edges(), current_edges)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import io
+import multiprocessing
+import unittest
+from contextlib import redirect_stdout
+from jackmesh.fakejack import FakeJackServer
+from jackmesh.fanout import fan_out
+from jackmesh.jackmesh import load
+from tests.helpers import FakeServerMixin
+
+
+def install_synthetic_server():
+    """Worker initializer: give the worker process a fake server of its own for its one task."""
+    global _installed
+    # Kept alive for the life of the process, which ends after the task.
+    _installed = FakeJackServer.synthetic(clients=4, ports_per_client=2, fanout=1).installed()
+    _installed.__enter__()
+
+
+class TestFanOut(FakeServerMixin, unittest.TestCase):
+
+    config_name = "rack.toml"
+
+    def setUp(self):
+        super().setUp()
+        self.write_config({"client0": {"out_0": ["client2:in_1"]},
+                           "server:studio-b": {"client1": {"out_0": ["client3:in_1"]}}})
+
+    def test_server_sections_apply_only_to_their_server(self):
+        with self.server.installed(), redirect_stdout(io.StringIO()):
+            plan = load(self.config_path, server_name="studio-b", dry_run=True)
+        self.assertEqual(self.server.server_name, "studio-b")
+        self.assertEqual(len(plan.to_connect), 2)
+
+        with self.server.installed(), redirect_stdout(io.StringIO()):
+            plan = load(self.config_path, dry_run=True)
+        self.assertIsNone(self.server.server_name)
+        self.assertEqual(len(plan.to_connect), 1)
+
+    def test_fan_out_aggregates_per_server_results(self):
+        # Each server is loaded in a new process, which starts with a synthetic graph of its own
+        report = fan_out(self.config_path, ["studio-a", "studio-b"], mp_context=multiprocessing.get_context("spawn"),
+                         initializer=install_synthetic_server)
+
+        self.assertTrue(report.ok)
+        self.assertEqual([result.server for result in report.results], ["studio-a", "studio-b"])
+        self.assertEqual([result.plan["connect"] for result in report.results], [1, 2])
+        self.assertIn("Connecting client1:out_0 to client3:in_1...", report.results[1].output)
+        self.assertIn("2 servers in", report.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
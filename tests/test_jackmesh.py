@@ -1,6 +1,12 @@
+import io
+import os
 import unittest
+from contextlib import redirect_stdout
 from unittest.mock import MagicMock, patch
-from jackmesh.jackmesh import load, Port, PortConnection
+from jackmesh.fakejack import JackPortIsInput, JackPortIsOutput, JackPortIsPhysical, FakeJackServer, offline_handler
+from jackmesh.jackmesh import load, load_rules, rule_cache_path, plan_connections, compile_rules, rules_port_filter, JackHandler, PlanCache, Port, PortConnection, PortRegistry, LAZY
+from tests.helpers import temp_dir
+
 
 class TestJackmesh(unittest.TestCase):
 
@@ -67,7 +73,7 @@ class TestJackmesh(unittest.TestCase):
         input_port1 = Port(MagicMock(), "SomeOtherClient:input1", "SomeOtherClient", MagicMock(), "input1", "audio", "uuid3", "input", [], 0, 0, 0)
         input_port2 = Port(MagicMock(), "SomeOtherClient:input2", "SomeOtherClient", MagicMock(), "input2", "audio", "uuid4", "input", [], 0, 0, 0)
 
-        mock_handler_instance.get_ports_by_regex.side_effect = lambda regex: {
+        mock_handler_instance.get_ports_by_regex.side_effect = lambda regex, direction=None: {
             "TestClient:output.*": [output_port1, output_port2],
             "input.*": [input_port1, input_port2]
         }.get(regex, [])
@@ -80,6 +86,364 @@ class TestJackmesh(unittest.TestCase):
         # Assertions
         # Verify that connect is called for all combinations of matching ports
         self.assertEqual(mock_connect.call_count, 4)
+        # The input regex is resolved once, not once per matched output port
+        self.assertEqual(mock_handler_instance.get_ports_by_regex.call_count, 2)
+
+    @patch('jackmesh.jackmesh.subprocess.check_output')
+    @patch('jackmesh.jackmesh.jacklib.port_get_all_connections')
+    def test_native_connections_match_jack_lsp(self, mock_get_all_connections, mock_check_output):
+        out1 = Port(MagicMock(), "A:out1", "A", MagicMock(), "out1", "audio", "uuid1", "output", [], 0, 0, 0)
+        out2 = Port(MagicMock(), "A:out2", "A", MagicMock(), "out2", "audio", "uuid2", "output", [], 0, 0, 0)
+        in1 = Port(MagicMock(), "B:in1", "B", MagicMock(), "in1", "audio", "uuid3", "input", [], 0, 0, 0)
+        in2 = Port(MagicMock(), "B:in2", "B", MagicMock(), "in2", "audio", "uuid4", "input", [], 0, 0, 0)
+
+        jh = offline_handler([out1, out2, in1, in2])
+
+        peers = {id(out1.port_ptr): ["B:in1", "B:in2"], id(out2.port_ptr): ["B:in2", "Late:in"]}
+        mock_get_all_connections.side_effect = lambda client, port_ptr: iter(peers.get(id(port_ptr), []))
+        mock_check_output.return_value = "A:out1\n   B:in1\n   B:in2\nA:out2\n   B:in2\n   Late:in\n" \
+                                         "B:in1\n   A:out1\nB:in2\n   A:out1\n   A:out2\n"
+
+        native = jh.get_jack_connections()
+        lsp = jh.get_jack_connections(backend="jack_lsp")
+
+        # Only output ports are queried and unknown ports are skipped.
+        self.assertEqual(mock_get_all_connections.call_count, 2)
+        self.assertEqual(set(native), set(lsp))
+        self.assertEqual(len(native), 3)
+
+    def test_port_registry_lookups(self):
+        out1 = Port(MagicMock(), "A:out1", "A", MagicMock(), "out1", "audio", "uuid1", "output", ["alsa:out1", ""], 0, 0, 0)
+        midi = Port(MagicMock(), "A:midi", "A", MagicMock(), "midi", "midi", "uuid2", "output", [], 0, 0, 0)
+        in1 = Port(MagicMock(), "B:in1", "B", MagicMock(), "in1", "audio", "uuid3", "input", [], 0, 0, 0)
+
+        jh = offline_handler([in1, out1, midi])
+
+        self.assertIs(jh.get_port_by_name("A:out1"), out1)
+        self.assertIsNone(jh.get_port_by_name("A:missing"))
+        self.assertIs(jh.get_port_by_uuid("uuid3"), in1)
+        self.assertIs(jh.get_port_by_alias("alsa:out1"), out1)
+        self.assertIsNone(jh.get_port_by_alias(""))
+        self.assertEqual(jh.get_client_names(), ["A", "B"])
+        self.assertEqual(jh.get_ports_by_client_name("A"), [out1, midi])
+        self.assertEqual(jh.get_ports_by_client_name("C"), [])
+        self.assertEqual(jh.get_ports_by_direction("output"), [out1, midi])
+        self.assertEqual(jh.get_ports_by_direction("output", "midi"), [midi])
+
+    def test_regex_matching_narrows_candidates(self):
+        ports = [
+            Port(MagicMock(), "Scarlett 2i2:midi_out", "Scarlett 2i2", MagicMock(), "midi_out", "midi", "u1", "output", [], 0, 0, 0),
+            Port(MagicMock(), "Scarlett 2i2:midi_in", "Scarlett 2i2", MagicMock(), "midi_in", "midi", "u2", "input", [], 0, 0, 0),
+            Port(MagicMock(), "Scarlet:out", "Scarlet", MagicMock(), "out", "audio", "u3", "output", [], 0, 0, 0),
+            Port(MagicMock(), "system:capture_1", "system", MagicMock(), "capture_1", "audio", "u4", "output", [], 0, 0, 0),
+        ]
+        jh = offline_handler(ports)
+
+        self.assertEqual(jh.get_ports_by_regex("Scarlett 2i2:midi.*"), ports[:2])
+        self.assertEqual(jh.get_ports_by_regex("Scarlett 2i2:midi.*", direction="input"), [ports[1]])
+        # An optional last literal character must not be treated as part of the prefix
+        self.assertEqual(jh.get_ports_by_regex("Scarlett?:.*"), [ports[2]])
+        self.assertEqual(jh.get_ports_by_regex("Scarlet.*", direction="output"), [ports[0], ports[2]])
+        self.assertEqual(jh.get_ports_by_regex(".*Scarlett.*MIDI.*"), [])
+        self.assertEqual(jh.get_ports_by_regex("system|Scarlet:out"), [ports[2], ports[3]])
+        # Match sets are memoized on the snapshot but callers get their own list
+        first = jh.get_ports_by_regex("Scarlet.*")
+        first.clear()
+        self.assertEqual(len(jh.get_ports_by_regex("Scarlet.*")), 3)
+
+    def test_plan_connections_only_touches_the_difference(self):
+        out1 = Port(MagicMock(), "A:out1", "A", MagicMock(), "out1", "audio", "uuid1", "output", [], 0, 0, 0)
+        out2 = Port(MagicMock(), "A:out2", "A", MagicMock(), "out2", "audio", "uuid2", "output", [], 0, 0, 0)
+        in1 = Port(MagicMock(), "B:in1", "B", MagicMock(), "in1", "audio", "uuid3", "input", [], 0, 0, 0)
+        in2 = Port(MagicMock(), "B:in2", "B", MagicMock(), "in2", "audio", "uuid4", "input", [], 0, 0, 0)
+        client = MagicMock()
+        keep = PortConnection(client, output=out1, input=in1)
+        stale = PortConnection(client, output=out2, input=in1)
+        new = PortConnection(client, output=out1, input=in2)
+        gone = PortConnection(client, output=out2, input=in2)
+
+        plan = plan_connections([keep, stale], wanted=[keep, new], unwanted=[gone])
+        self.assertEqual(plan.to_connect, {new})
+        self.assertEqual(plan.to_disconnect, set())
+        self.assertEqual(plan.unchanged, {keep})
+        self.assertEqual(plan.not_found, {gone})
+
+        # With disconnect_others only the edges that are not wanted are torn down
+        plan = plan_connections([keep, stale], wanted=[keep, new], disconnect_others=True)
+        self.assertEqual(plan.to_connect, {new})
+        self.assertEqual(plan.to_disconnect, {stale})
+        self.assertEqual(plan.unchanged, {keep})
+
+    @patch('jackmesh.jackmesh.toml.load')
+    @patch('jackmesh.jackmesh.JackHandler')
+    @patch('jackmesh.jackmesh.PortConnection.disconnect')
+    @patch('jackmesh.jackmesh.PortConnection.connect')
+    def test_dry_run_does_not_apply(self, mock_connect, mock_disconnect, MockJackHandler, mock_toml_load):
+        mock_toml_load.return_value = {"TestClient": {"output1": ["input1"]}}
+        output_port = Port(MagicMock(), "TestClient:output1", "TestClient", MagicMock(), "output1", "audio", "uuid1", "output", [], 0, 0, 0)
+        input_port = Port(MagicMock(), "input1", "SomeOtherClient", MagicMock(), "input1", "audio", "uuid2", "input", [], 0, 0, 0)
+        mock_handler_instance = MockJackHandler.return_value
+        mock_handler_instance.get_port_by_name.side_effect = {"TestClient:output1": output_port, "input1": input_port}.get
+        mock_handler_instance.get_jack_connections.return_value = []
+
+        plan = load("dummy_path.toml", disconnect=True, dry_run=True)
+
+        self.assertEqual(len(plan.to_connect), 1)
+        mock_connect.assert_not_called()
+        mock_disconnect.assert_not_called()
+
+    @patch('jackmesh.jackmesh.c_char_p_p_to_list')
+    @patch('jackmesh.jackmesh.jacklib.get_ports')
+    def test_refresh_ports_only_queries_new_ports(self, mock_get_ports, mock_to_list):
+        out1 = Port(MagicMock(), "A:out1", "A", MagicMock(), "out1", "audio", "uuid1", "output", [], 0, 0, 0)
+        in1 = Port(MagicMock(), "B:in1", "B", MagicMock(), "in1", "audio", "uuid2", "input", [], 0, 0, 0)
+        new = Port(MagicMock(), "C:in1", "C", MagicMock(), "in1", "audio", "uuid3", "input", [], 0, 0, 0)
+
+        jh = offline_handler([out1, in1])
+
+        with patch.object(JackHandler, '_make_port', return_value=new) as mock_make_port:
+            mock_to_list.return_value = ["A:out1", "B:in1"]
+            self.assertEqual(jh.refresh_ports(), [out1, in1])
+            mock_make_port.assert_not_called()
+
+            mock_to_list.return_value = ["A:out1", "C:in1"]
+            self.assertEqual(jh.refresh_ports(), [out1, new])
+            mock_make_port.assert_called_once_with("C:in1")
+            self.assertIsNone(jh.get_port_by_name("B:in1"))
+
+    def test_tracking_applies_notifications_as_deltas(self):
+        names = {1: "A:out1", 2: "B:in1", 3: "C:in1"}
+        ports = {name: Port(MagicMock(), name, name.split(":")[0], MagicMock(), name.split(":")[1], "audio",
+                            f"uuid{port_id}", "output" if "out" in name else "input", [], 0, 0, 0)
+                 for port_id, name in names.items()}
+        ptr_names = {id(port.port_ptr): name for name, port in ports.items()}
+
+        jh = offline_handler()
+
+        with patch.multiple('jackmesh.jackmesh.jacklib',
+                            set_port_registration_callback=MagicMock(), set_port_rename_callback=MagicMock(),
+                            set_client_registration_callback=MagicMock(), set_port_connect_callback=MagicMock(),
+                            activate=MagicMock(return_value=0), get_ports=MagicMock(),
+                            port_by_name=MagicMock(return_value=1),
+                            port_by_id=MagicMock(side_effect=lambda client, port_id: port_id),
+                            port_name=MagicMock(side_effect=names.get),
+                            port_flags=MagicMock(side_effect=lambda ptr: 1 if ports[names[ptr]].direction == "input" else 2),
+                            port_get_all_connections=MagicMock(
+                                side_effect=lambda client, ptr: iter(["B:in1"] if ptr_names[id(ptr)] == "A:out1" else []))), \
+             patch('jackmesh.jackmesh.c_char_p_p_to_list', return_value=["A:out1", "B:in1"]), \
+             patch.object(JackHandler, '_make_port', side_effect=ports.get):
+            jh.enable_tracking()
+            snapshot = jh.get_snapshot()
+            self.assertEqual(len(snapshot.ports), 2)
+            self.assertEqual(snapshot.edges, {("A:out1", "B:in1")})
+            self.assertIs(jh.get_snapshot(), snapshot)
+
+            jh._on_port_registration(3, 1, None)
+            # The connect notification may name the input port first
+            jh._on_port_connect(3, 1, 1, None)
+            snapshot = jh.get_snapshot()
+            self.assertEqual(snapshot.edges, {("A:out1", "B:in1"), ("A:out1", "C:in1")})
+            self.assertIs(jh.get_port_by_name("C:in1"), ports["C:in1"])
+
+            jh._on_port_rename(3, b"C:in1", b"C:renamed", None)
+            self.assertEqual(jh.get_snapshot().edges, {("A:out1", "B:in1"), ("A:out1", "C:renamed")})
+            self.assertEqual(jh.get_port_by_name("C:renamed").uuid, "uuid3")
+
+            jh._on_port_connect(1, 2, 0, None)
+            self.assertEqual({(c.output.name, c.input.name) for c in jh.get_jack_connections()}, {("A:out1", "C:renamed")})
+
+            jh._on_client_registration(b"A", 0, None)
+            snapshot = jh.get_snapshot()
+            self.assertEqual(snapshot.edges, frozenset())
+            self.assertEqual(jh.get_client_names(), ["B", "C"])
+            self.assertGreater(snapshot.version, 1)
+
+    @patch('jackmesh.jackmesh.jacklib.port_get_total_latency', return_value=512)
+    @patch('jackmesh.jackmesh.jacklib.port_get_aliases', return_value=(1, "alsa_pcm:out1", ""))
+    @patch('jackmesh.jackmesh.jacklib.port_uuid', return_value=42)
+    def test_lazy_port_attributes(self, mock_port_uuid, mock_get_aliases, mock_total_latency):
+        port = Port(MagicMock(), "A:out1", "A", MagicMock(), "out1", "audio", LAZY, "output", LAZY, LAZY, LAZY, LAZY)
+        renamed = port.renamed("A:renamed")
+        self.assertEqual((renamed.client, renamed.port_name), ("A", "renamed"))
+        mock_port_uuid.assert_not_called()
+
+        self.assertEqual(port.uuid, 42)
+        self.assertEqual(port.uuid, 42)
+        self.assertEqual(port.aliases, ["alsa_pcm:out1", ""])
+        self.assertEqual(port.total_latency, 512)
+        mock_port_uuid.assert_called_once()
+        mock_get_aliases.assert_called_once()
+        mock_total_latency.assert_called_once()
+
+        # The registry only needs the eagerly known attributes to be built
+        mock_port_uuid.reset_mock()
+        jh = offline_handler([renamed])
+        self.assertIs(jh.get_port_by_name("A:renamed"), renamed)
+        mock_port_uuid.assert_not_called()
+        self.assertIs(jh.get_port_by_alias("alsa_pcm:out1"), renamed)
+
+    @patch('jackmesh.jackmesh.c_char_p_p_to_list', return_value=[])
+    @patch('jackmesh.jackmesh.jacklib.get_ports')
+    def test_port_filter_is_applied_by_the_server(self, mock_get_ports, mock_to_list):
+        jh = offline_handler()
+        jh.set_port_filter(name_pattern="^(A):", direction="output")
+        jh.get_jack_ports()
+        mock_get_ports.assert_called_once_with(jh.client, "^(A):", None, 0x2)
+
+    def test_rules_port_filter(self):
+        rules = compile_rules({"Pianoteq": {"regex:out_.*": ["system:playback_1"]},
+                               "REAPER (x86)": {"out1": ["regex:system:capture_.*"]}}, regex_matching=True)
+        self.assertEqual(rules_port_filter(rules), "^(Pianoteq|REAPER \\(x86\\)|system):")
+        rules = compile_rules({"REAPER": {"out1": ["regex:.*Scarlett.*"]}}, regex_matching=True)
+        self.assertIsNone(rules_port_filter(rules))
+
+    def test_alias_and_uuid_specs(self):
+        server = FakeJackServer.synthetic(clients=3, ports_per_client=1, fanout=0)
+        config_path = os.path.join(temp_dir(self), "scene.toml")
+        in_uuid = server.ports["client2:in_0"].id
+        with open(config_path, "w") as f:
+            f.write('[alias0]\n"alias:capture_0" = ["alias:alias1:playback_0", "uuid:%d", "alias:alias1:capture_0"]\n'
+                    % in_uuid)
+        self.assertIsNone(rules_port_filter(load_rules(config_path, use_cache=False)))
+
+        with server.installed(), redirect_stdout(io.StringIO()) as stdout:
+            plan = load(config_path, use_cache=False)
+        self.assertEqual(server.edges(), {("client0:out_0", "client1:in_0"), ("client0:out_0", "client2:in_0")})
+        self.assertEqual(len(plan.to_connect), 2)
+        # An alias of an output port never matches on the input side
+        self.assertIn("Could not find any port for: alias:alias1:capture_0", stdout.getvalue())
+
+    def test_transactional_load_makes_before_breaking(self):
+        server = FakeJackServer()
+        for client in ("old", "new"):
+            server.register_port(f"{client}:out", JackPortIsOutput)
+        server.register_port("fx:in", JackPortIsInput)
+        server.register_port("system:playback_1", JackPortIsInput | JackPortIsPhysical)
+        server.add_connection("old:out", "fx:in")
+        server.add_connection("old:out", "system:playback_1")
+        config_path = os.path.join(temp_dir(self), "scene.toml")
+        with open(config_path, "w") as f:
+            f.write('[new]\nout = ["fx:in", "system:playback_1"]\n')
+
+        with server.installed(), redirect_stdout(io.StringIO()) as stdout:
+            plan = load(config_path, disconnect=True, transactional=True, use_cache=False)
+        self.assertEqual(server.edges(), {("new:out", "fx:in"), ("new:out", "system:playback_1")})
+        # fx:in briefly gets both sources; the speakers never do
+        self.assertEqual([(r.action, r.connection.output.name, r.connection.input.name) for r in plan.report.results], [
+            ("connect", "new:out", "fx:in"),
+            ("disconnect", "old:out", "fx:in"),
+            ("disconnect", "old:out", "system:playback_1"),
+            ("connect", "new:out", "system:playback_1"),
+        ])
+        self.assertIn("Mutation window:", stdout.getvalue())
+
+    def test_transactional_load_rolls_back_to_the_previous_graph(self):
+        server = FakeJackServer.synthetic(clients=4, ports_per_client=2, fanout=1)
+        before = server.edges()
+        config_path = os.path.join(temp_dir(self), "scene.toml")
+        with open(config_path, "w") as f:
+            f.write('[client0]\nout_0 = ["client2:in_0"]\n[client1]\nout_1 = ["client3:in_1"]\n')
+        connect = server.add_connection
+        server.connect = lambda client, output, input: -1 if input == "client3:in_1" else connect(output, input)
+
+        with server.installed(), redirect_stdout(io.StringIO()) as stdout:
+            plan = load(config_path, disconnect=True, transactional=True, use_cache=False)
+        self.assertTrue(plan.report.rolled_back)
+        self.assertFalse(plan.report.ok)
+        self.assertEqual(server.edges(), before)
+        self.assertIn("Rolled back all changes", stdout.getvalue())
+
+    def test_connection_made_by_someone_else_counts_as_done(self):
+        for transactional in (False, True):
+            with self.subTest(transactional=transactional):
+                server = FakeJackServer.synthetic(clients=4, ports_per_client=2, fanout=1)
+                config_path = os.path.join(temp_dir(self), "scene.toml")
+                with open(config_path, "w") as f:
+                    f.write('[client0]\nout_0 = ["client2:in_0"]\n[client1]\nout_1 = ["client3:in_1"]\n')
+                connect = server.add_connection
+
+                def racing_connect(client, output, input):
+                    # Another client makes the connection between our plan and our request
+                    if input == "client3:in_1":
+                        connect(output, input)
+                    return connect(output, input)
+                server.connect = racing_connect
+
+                with server.installed(), redirect_stdout(io.StringIO()) as stdout:
+                    plan = load(config_path, disconnect=True, transactional=transactional, use_cache=False)
+                self.assertTrue(plan.report.ok)
+                self.assertFalse(plan.report.rolled_back)
+                self.assertEqual(server.edges(), {("client0:out_0", "client2:in_0"), ("client1:out_1", "client3:in_1")})
+                self.assertIn("Connecting client1:out_1 to client3:in_1... already connected", stdout.getvalue())
+
+    @patch('jackmesh.jackmesh.jacklib.port_get_all_connections')
+    def test_edge_table_materializes_on_demand(self, mock_get_all_connections):
+        out1 = Port(MagicMock(), "A:out1", "A", MagicMock(), "out1", "audio", "uuid1", "output", [], 0, 0, 0)
+        in1 = Port(MagicMock(), "B:in1", "B", MagicMock(), "in1", "audio", "uuid2", "input", [], 0, 0, 0)
+        in2 = Port(MagicMock(), "B:in2", "B", MagicMock(), "in2", "audio", "uuid3", "input", [], 0, 0, 0)
+        mock_get_all_connections.side_effect = lambda client, port_ptr: iter(["B:in1", "B:in2"])
+        jh = offline_handler([out1, in1, in2])
+
+        table = jh.get_edge_table()
+        self.assertEqual(len(table), 2)
+        self.assertEqual(list(table.pairs()), [(out1.id, in1.id), (out1.id, in2.id)])
+        self.assertEqual(list(table.names()), [("A:out1", "B:in1"), ("A:out1", "B:in2")])
+        self.assertIs(table.connection(1).input, in2)
+        self.assertEqual(set(table.connections()), set(jh.get_jack_connections()))
+
+        # Compact representation: no per-instance __dict__, renaming keeps the id
+        self.assertFalse(hasattr(out1, "__dict__"))
+        self.assertFalse(hasattr(table.connection(0), "__dict__"))
+        self.assertEqual(out1.renamed("A:renamed").id, out1.id)
+        self.assertNotEqual(in1.id, in2.id)
+
+    def test_compiled_rules_are_cached_until_the_config_changes(self):
+        config_path = os.path.join(temp_dir(self), "scene.toml")
+        with open(config_path, "w") as f:
+            f.write('[A]\n"regex:out.*" = ["B:in1"]\n"disconnect:out2" = ["B:in2"]\n')
+
+        rules = load_rules(config_path, regex_matching=True)
+        self.assertTrue(os.path.exists(rule_cache_path(config_path)))
+        with patch('jackmesh.jackmesh.toml.loads') as mock_toml_loads:
+            cached = load_rules(config_path, regex_matching=True)
+            # Rewriting identical contents changes the mtime, but the hash still matches
+            os.utime(config_path, ns=(0, 0))
+            load_rules(config_path, regex_matching=True)
+            mock_toml_loads.assert_not_called()
+        self.assertEqual([repr(rule) for rule in cached], [repr(rule) for rule in rules])
+        self.assertTrue(cached[1].is_disconnect)
+
+        # A cached regex rule still requires -r
+        with self.assertRaises(RuntimeError):
+            load_rules(config_path)
+
+        with open(config_path, "w") as f:
+            f.write('[A]\nout1 = ["B:in1", "B:in2"]\n')
+        self.assertEqual(load_rules(config_path)[0].inputs, ["B:in1", "B:in2"])
+
+    def test_plan_cache_evicts_least_recently_used(self):
+        out1 = Port(MagicMock(), "A:out1", "A", MagicMock(), "out1", "audio", "uuid1", "output", [], 0, 0, 0)
+        in1 = Port(MagicMock(), "B:in1", "B", MagicMock(), "in1", "audio", "uuid2", "input", [], 0, 0, 0)
+        in2 = Port(MagicMock(), "B:in2", "B", MagicMock(), "in2", "audio", "uuid3", "input", [], 0, 0, 0)
+        edges = {"a": {PortConnection(None, output=out1, input=in1)},
+                 "b": {PortConnection(None, output=out1, input=in2)},
+                 "c": {PortConnection(None, output=out1, input=in1), PortConnection(None, output=out1, input=in2)}}
+        cache = PlanCache(max_entries=2, max_edges=2)
+        cache.put("a", edges["a"], ())
+        cache.put("b", edges["b"], ())
+        cache.get("a")
+        cache.put("c", edges["c"], ())
+        # Over both bounds: "b" goes first as least recently used, then "a" to stay within 2 edges
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), (frozenset(edges["c"]), frozenset()))
+
+        registry = PortRegistry([out1, in1])
+        self.assertEqual(registry.fingerprint, PortRegistry([out1, in1]).fingerprint)
+        self.assertNotEqual(registry.fingerprint, PortRegistry([out1, in1.renamed("B:other")]).fingerprint)
+        # A port re-registered under the same name is a different port
+        reregistered = Port(MagicMock(), "B:in1", "B", MagicMock(), "in1", "audio", "uuid4", "input", [], 0, 0, 0)
+        self.assertNotEqual(registry.fingerprint, PortRegistry([out1, reregistered]).fingerprint)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+import io
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from jackmesh import latency
+from jackmesh.fakejack import JackPortIsInput, JackPortIsOutput, JackPortIsPhysical, FakeJackServer
+from jackmesh.jackmesh import JackHandler, main
+
+
+def make_server():
+    server = FakeJackServer()
+    server.register_port("system:capture_1", JackPortIsOutput | JackPortIsPhysical, latency=256)
+    server.register_port("system:playback_1", JackPortIsInput | JackPortIsPhysical, latency=512)
+    # Latencies are cumulative, as JACK reports them: fx adds 64, synth 32, mixer nothing and a and b 16 each.
+    for client, in_latency, out_latency in (("fx", 256, 320), ("synth", 0, 32), ("mixer", 32, 32), ("a", 40, 56),
+                                            ("b", 56, 72)):
+        server.register_port(f"{client}:in", JackPortIsInput, latency=in_latency)
+        server.register_port(f"{client}:out", JackPortIsOutput, latency=out_latency)
+    for output, input in (("system:capture_1", "fx:in"), ("fx:out", "system:playback_1"),
+                          ("synth:out", "mixer:in"), ("mixer:out", "system:playback_1"),
+                          ("a:out", "b:in"), ("b:out", "a:in")):
+        server.add_connection(output, input)
+    return server
+
+
+class TestLatency(unittest.TestCase):
+
+    def test_slowest_chains_and_feedback_loops(self):
+        server = make_server()
+        with server.installed():
+            report = latency.analyze(JackHandler())
+
+        self.assertEqual([(chain.latency, [port.name for port in chain.ports]) for chain in report.chains], [
+            (832, ["system:capture_1", "fx:in", "fx:out", "system:playback_1"]),
+            (544, ["synth:out", "mixer:in", "mixer:out", "system:playback_1"]),
+        ])
+        # The physical playback port doesn't feed the capture port back into the graph
+        self.assertEqual(len(report.loops), 1)
+        loop = report.loops[0]
+        self.assertEqual(loop.latency, 32)
+        self.assertIs(loop.ports[0], loop.ports[-1])
+        self.assertEqual({port.name for port in loop.ports}, {"a:out", "b:in", "b:out", "a:in"})
+        self.assertEqual((report.ports, report.connections), (11, 6))
+
+    def test_top_limits_the_chains(self):
+        server = make_server()
+        with server.installed():
+            report = latency.analyze(JackHandler(), top=1)
+        self.assertEqual(len(report.chains), 1)
+
+    def test_cli_prints_the_report(self):
+        server = make_server()
+        stdout = io.StringIO()
+        with server.installed(), patch.object(sys, "argv", ["jackmesh", "--latency", "1"]), redirect_stdout(stdout):
+            main()
+        self.assertIn("     832  system:capture_1 -> fx:in -> fx:out -> system:playback_1", stdout.getvalue())
+        self.assertNotIn("synth:out", stdout.getvalue())
+        self.assertIn("Feedback loops", stdout.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import json
+import os
+import pstats
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from jackmesh import jackmesh, profiling
+from jackmesh.jackmesh import JackHandler, dumps, load, main
+from tests.helpers import FakeServerMixin
+
+
+class TestProfiling(FakeServerMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_config({"client0": {"out_0": ["client2:in_0"]}})
+
+    def test_load_records_phases_counters_and_jacklib_calls(self):
+        with self.server.installed(), redirect_stdout(io.StringIO()), profiling.profiling() as profile:
+            load(self.config_path, disconnect=True)
+
+        for phase in ("client_open", "parse_config", "enumerate_ports", "read_connections", "resolve", "plan",
+                      "apply_disconnect", "apply_connect"):
+            self.assertEqual(profile.phases[phase]["calls"], 1, phase)
+        self.assertEqual(profile.counters["ports_enumerated"], 16)
+        self.assertEqual(profile.counters["edges_read"], 8)
+        self.assertEqual(profile.counters["connect_ops"], 1)
+        self.assertEqual(profile.counters["disconnect_ops"], 8)
+        # Every call that reached the server went through the counting wrapper
+        self.assertEqual(profile.jacklib_calls, self.server.calls)
+        self.assertEqual(json.loads(profile.to_json())["jacklib_calls_total"], sum(self.server.calls.values()))
+
+    def test_dump_records_formatting_per_client(self):
+        with self.server.installed(), profiling.profiling() as profile:
+            jh = JackHandler()
+            dumps(jh)
+            jh.close()
+
+        self.assertEqual(profile.phases["read_connections"]["calls"], 1)
+        # One table per client with connections
+        self.assertEqual(profile.phases["format_toml"]["calls"], 4)
+        self.assertEqual(profile.counters["edges_dumped"], 8)
+
+    def test_inactive_profiling_leaves_jacklib_alone(self):
+        with self.server.installed():
+            with profiling.profiling():
+                self.assertIsNot(jackmesh.jacklib, self.server)
+            self.assertIs(jackmesh.jacklib, self.server)
+        self.assertIsNone(profiling._active)
+
+    def test_cli_writes_timings_json_and_cprofile_stats(self):
+        timings_path = os.path.join(self.tmpdir, "timings.json")
+        cprofile_path = os.path.join(self.tmpdir, "load.prof")
+        argv = ["jackmesh", "-l", self.config_path, "--timings", timings_path, "--profile", cprofile_path]
+        with self.server.installed(), patch.object(sys, "argv", argv), redirect_stdout(io.StringIO()):
+            main()
+
+        with open(timings_path) as f:
+            timings = json.load(f)
+        self.assertIn("resolve", timings["phases"])
+        self.assertEqual(timings["cprofile"], cprofile_path)
+        self.assertGreater(pstats.Stats(cprofile_path).total_calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import MagicMock, patch
+from jackmesh.jackmesh import Port, PortRegistry, compile_rules
+from jackmesh.watch import RuleIndex, Watcher, _EventBatcher
+
+
+def make_port(name, direction):
+    client, port_name = name.split(":", 1)
+    return Port(MagicMock(), name, client, MagicMock(), port_name, "audio", f"uuid-{name}", direction, [], 0, 0, 0)
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            "Pianoteq": {"out_1": ["system:playback_1"], "regex:out_.*": ["REAPER:in1"]},
+            "Midi-Bridge": {"disconnect:regex:.*Scarlett.*": ["Pianoteq:midi_in"]},
+            "REAPER": {"out1": ["regex:system:playback_.*"]},
+        }
+        self.rules = compile_rules(self.config, regex_matching=True)
+
+    def make_watcher(self, ports):
+        registry = PortRegistry(ports)
+        jh = MagicMock()
+        jh.tracking = True
+        jh.get_port_registry.return_value = registry
+        jh.get_port_by_name.side_effect = registry.get
+        jh.get_ports_by_regex.side_effect = lambda regex, direction=None: registry.match_regex(regex, direction)
+        jh.get_jack_connections.return_value = []
+        jh.get_port_connections.return_value = []
+        return Watcher(jh, self.rules, regex_matching=True)
+
+    def test_rule_index_candidates(self):
+        index = RuleIndex(self.rules)
+        pianoteq_out = make_port("Pianoteq:out_1", "output")
+        self.assertEqual({r.output_key for r in index.candidates(pianoteq_out)}, {"out_1", "regex:out_.*"})
+        self.assertEqual([r.output_key for r in index.candidates(make_port("Midi-Bridge:Scarlett MIDI", "output"))], ["regex:.*Scarlett.*"])
+        playback = make_port("system:playback_2", "input")
+        self.assertEqual([r.output_key for r in index.candidates(playback)], ["out1"])
+        self.assertEqual(index.candidates(make_port("Other:in", "input")), [])
+
+    def test_rule_index_alias_and_uuid_specs(self):
+        index = RuleIndex(compile_rules({"alsa_pcm": {"alias:capture_1": ["uuid:7"]}}))
+        capture = make_port("system:capture_1", "output")
+        capture.aliases = ["alsa_pcm:capture_1"]
+        self.assertEqual([r.output_key for r in index.candidates(capture)], ["alias:capture_1"])
+        playback = make_port("system:playback_1", "input")
+        playback.uuid = 7
+        self.assertEqual([r.output_key for r in index.candidates(playback)], ["alias:capture_1"])
+        self.assertEqual(index.candidates(make_port("system:playback_2", "input")), [])
+
+    def test_new_ports_only_get_their_rules(self):
+        ports = [make_port("REAPER:out1", "output"), make_port("REAPER:in1", "input"),
+                 make_port("system:playback_1", "input"), make_port("system:playback_2", "input"),
+                 make_port("Pianoteq:out_1", "output"), make_port("Pianoteq:out_2", "output")]
+        watcher = self.make_watcher(ports)
+
+        connected = []
+        with patch('jackmesh.jackmesh.PortConnection.connect', autospec=True, side_effect=connected.append):
+            watcher.apply_to_ports(["Pianoteq:out_2"])
+            self.assertEqual({(c.output.name, c.input.name) for c in connected}, {("Pianoteq:out_2", "REAPER:in1")})
+
+            connected.clear()
+            watcher.apply_to_ports(["system:playback_2", "Gone:port"])
+            self.assertEqual({(c.output.name, c.input.name) for c in connected}, {("REAPER:out1", "system:playback_2")})
+
+    def test_run_reports_failing_batches_on_stderr(self):
+        watcher = self.make_watcher([])
+        watcher._batcher.wait_batch = MagicMock(side_effect=[{"Pianoteq:out_1"}, KeyboardInterrupt])
+        with patch.object(watcher, "apply_all"), \
+                patch.object(watcher, "apply_to_ports", side_effect=RuntimeError("server went away")), \
+                redirect_stdout(io.StringIO()) as stdout, redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(KeyboardInterrupt):
+                watcher.run()
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertIn("Error applying connections for new ports: server went away", stderr.getvalue())
+
+    def test_batcher_collects_bursts(self):
+        batcher = _EventBatcher()
+
+        def register_ports():
+            for i in range(64):
+                batcher.add(f"client:port_{i}")
+
+        thread = threading.Thread(target=register_ports)
+        thread.start()
+        batch = batcher.wait_batch(debounce=0.2, max_delay=5, timeout=5)
+        thread.join()
+        self.assertEqual(len(batch), 64)
+        self.assertEqual(batcher.wait_batch(debounce=0.01, max_delay=1, timeout=0.01), set())
+
+if __name__ == '__main__':
+    unittest.main()